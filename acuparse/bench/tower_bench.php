@@ -0,0 +1,145 @@
+<?php
+/*
+ * Benchmark for the tower query in data.php.
+ *
+ * Seeds a scratch MySQL/MariaDB database with a year of synthetic tower
+ * readings and reports how long the latest readings take to fetch against
+ * the number of towers, with the old per-tower queries and the single
+ * query used by data.php. When --url is given the data page is timed too
+ * (point the Acuparse instance serving it at the scratch database).
+ *
+ * DO NOT run this against a live Acuparse database, it empties the
+ * `towers` and `tower_data` tables.
+ *
+ * Usage:
+ *   php tower_bench.php --db=acuparse_bench [--host=localhost] [--user=root] [--pass=]
+ *       [--towers=1,5,10,25,50,100] [--days=365] [--interval=600] [--runs=20]
+ *       [--url=http://acuparse-server/data?json&sections=current] [--no-seed]
+ */
+
+$opts = getopt('', ['host:', 'user:', 'pass:', 'db:', 'towers:', 'days:', 'interval:', 'runs:', 'url:', 'no-seed']);
+if (!isset($opts['db'])) {
+	fwrite(STDERR, "--db is required\n");
+	exit(1);
+}
+
+$host     = isset($opts['host']) ? $opts['host'] : 'localhost';
+$user     = isset($opts['user']) ? $opts['user'] : 'root';
+$pass     = isset($opts['pass']) ? $opts['pass'] : '';
+$counts   = array_map('intval', explode(',', isset($opts['towers']) ? $opts['towers'] : '1,5,10,25,50,100'));
+$days     = isset($opts['days']) ? (int) $opts['days'] : 365;
+$interval = isset($opts['interval']) ? (int) $opts['interval'] : 600;
+$runs     = isset($opts['runs']) ? (int) $opts['runs'] : 20;
+$url      = isset($opts['url']) ? $opts['url'] : null;
+$maxTowers = max($counts);
+
+$conn = mysqli_connect($host, $user, $pass, $opts['db']);
+if (!$conn) {
+	fwrite(STDERR, "Connection failed: " . mysqli_connect_error() . "\n");
+	exit(1);
+}
+
+function query($conn, $sql)
+{
+	$result = mysqli_query($conn, $sql);
+	if ($result === false) {
+		fwrite(STDERR, mysqli_error($conn) . "\n" . $sql . "\n");
+		exit(1);
+	}
+	return $result;
+}
+
+function sensorID($n)
+{
+	return sprintf('%08d', $n);
+}
+
+function percentile($samples, $p)
+{
+	sort($samples);
+	return $samples[(int) min(count($samples) - 1, floor(count($samples) * $p))];
+}
+
+// Time $fn $runs times and return [p50, p95] in milliseconds.
+function timeRuns($fn, $runs)
+{
+	$samples = [];
+	for ($i = 0; $i < $runs; $i++) {
+		$start = microtime(true);
+		$fn();
+		$samples[] = (microtime(true) - $start) * 1000;
+	}
+	return [percentile($samples, 0.5), percentile($samples, 0.95)];
+}
+
+if (!isset($opts['no-seed'])) {
+	query($conn, "CREATE TABLE IF NOT EXISTS `towers` (`id` INT AUTO_INCREMENT PRIMARY KEY, `name` VARCHAR(255) NOT NULL, `sensor` CHAR(8) NOT NULL, `arrange` INT NOT NULL)");
+	query($conn, "CREATE TABLE IF NOT EXISTS `tower_data` (`sensor` CHAR(8) NOT NULL, `tempF` DECIMAL(5,2), `relH` TINYINT, `timestamp` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)");
+	query($conn, "TRUNCATE TABLE `tower_data`");
+
+	$end = time();
+	$start = $end - $days * 86400;
+	$rows = (int) (($end - $start) / $interval);
+	echo "Seeding $maxTowers towers x $rows readings\n";
+	for ($n = 1; $n <= $maxTowers; $n++) {
+		$sensor = sensorID($n);
+		$values = [];
+		for ($ts = $start; $ts <= $end; $ts += $interval) {
+			$season = sin(2 * M_PI * ($ts - $start) / (365 * 86400));
+			$daily  = sin(2 * M_PI * ($ts % 86400) / 86400);
+			$values[] = sprintf("('%s', %.2f, %d, FROM_UNIXTIME(%d))", $sensor, 50 + 30 * $season + 10 * $daily, 60 + 30 * $daily, $ts);
+			if (count($values) === 1000) {
+				query($conn, "INSERT INTO `tower_data` (`sensor`, `tempF`, `relH`, `timestamp`) VALUES " . implode(',', $values));
+				$values = [];
+			}
+		}
+		if ($values) {
+			query($conn, "INSERT INTO `tower_data` (`sensor`, `tempF`, `relH`, `timestamp`) VALUES " . implode(',', $values));
+		}
+	}
+}
+
+// Same indexes as ../sql/data_indexes.sql
+if (mysqli_num_rows(query($conn, "SHOW INDEX FROM `tower_data` WHERE `Key_name` = 'sensor_timestamp'")) === 0) {
+	query($conn, "ALTER TABLE `tower_data` ADD INDEX `sensor_timestamp` (`sensor`, `timestamp`)");
+}
+if (mysqli_num_rows(query($conn, "SHOW INDEX FROM `tower_data` WHERE `Key_name` = 'timestamp'")) === 0) {
+	query($conn, "ALTER TABLE `tower_data` ADD INDEX `timestamp` (`timestamp`)");
+}
+query($conn, "ANALYZE TABLE `tower_data`");
+
+printf("%8s %16s %16s %16s\n", 'towers', 'per-tower ms', 'single ms', 'data.php ms');
+foreach ($counts as $count) {
+	query($conn, "TRUNCATE TABLE `towers`");
+	for ($n = 1; $n <= $count; $n++) {
+		query($conn, sprintf("INSERT INTO `towers` (`name`, `sensor`, `arrange`) VALUES ('Tower %d', '%s', %d)", $n, sensorID($n), $n));
+	}
+
+	$perTower = timeRuns(function () use ($conn) {
+		$result = query($conn, "SELECT * FROM `towers` ORDER BY `arrange`");
+		while ($row = mysqli_fetch_assoc($result)) {
+			mysqli_fetch_assoc(query($conn, "SELECT * FROM `tower_data` WHERE `sensor` = '$row[sensor]' ORDER BY `timestamp` DESC LIMIT 1"));
+		}
+	}, $runs);
+
+	$single = timeRuns(function () use ($conn) {
+		$result = query($conn, "SELECT `towers`.`sensor`, `towers`.`name`, `tower_data`.`tempF`, `tower_data`.`relH`, `tower_data`.`timestamp`
+			FROM `towers`
+			LEFT JOIN (SELECT `sensor`, MAX(`timestamp`) AS `timestamp` FROM `tower_data` GROUP BY `sensor`) AS `latest` ON `latest`.`sensor` = `towers`.`sensor`
+			LEFT JOIN `tower_data` ON `tower_data`.`sensor` = `latest`.`sensor` AND `tower_data`.`timestamp` = `latest`.`timestamp`
+			ORDER BY `towers`.`arrange`");
+		while (mysqli_fetch_assoc($result)) {
+		}
+	}, $runs);
+
+	$page = ['-', '-'];
+	if ($url !== null) {
+		$page = timeRuns(function () use ($url) {
+			file_get_contents($url);
+		}, $runs);
+		$page = array_map(function ($ms) { return sprintf('%.1f', $ms); }, $page);
+	}
+
+	printf("%8d %7.1f / %6.1f %7.1f / %6.1f %7s / %6s\n", $count, $perTower[0], $perTower[1], $single[0], $single[1], $page[0], $page[1]);
+}
+echo "(p50 / p95 over $runs runs)\n";
@@ -0,0 +1,14 @@
+-- Indexes used by data.php
+--
+-- Run once against the Acuparse database, eg:
+--   mysql -u acuparse -p acuparse < data_indexes.sql
+--
+-- Latest reading per tower (SELECT ... MAX(`timestamp`) GROUP BY `sensor`)
+ALTER TABLE `tower_data` ADD INDEX `sensor_timestamp` (`sensor`, `timestamp`);
+
+-- Latest tower reading of any tower (SELECT MAX(`timestamp`)), checked on every
+-- request and every second by stream.php
+ALTER TABLE `tower_data` ADD INDEX `timestamp` (`timestamp`);
+
+-- Timestamp of the latest observation (ORDER BY `timestamp` DESC LIMIT 1)
+ALTER TABLE `windspeed` ADD INDEX `timestamp` (`timestamp`);
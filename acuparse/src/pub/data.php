@@ -2,63 +2,333 @@
 $array = [];
 $moon = [];
 
+// Sections that can be requested with ?sections=current,moon,...
+// The towers section (latest reading of each tower by sensor ID) is only
+// sent when asked for, otherwise the towers are listed in current by name.
+$allSections = ['current', 'yesterday', 'this_week', 'this_month', 'last_month', 'this_year', 'all_time', 'moon', 'towers'];
+$sections = array_values(array_diff($allSections, ['towers']));
+if (isset($_GET['sections']) && $_GET['sections'] !== '') {
+	$sections = array_values(array_intersect($allSections, explode(',', $_GET['sections'])));
+}
+
+// ?units=imperial or ?units=metric only sends the fields of one unit system,
+// clients derive the others. Both are sent by default.
+$units = (isset($_GET['units']) && in_array($_GET['units'], ['imperial', 'metric'])) ? $_GET['units'] : null;
+
 require(dirname(__DIR__) . '/inc/loader.php');
 
 // get timestamp for current conditions:
 $result = mysqli_fetch_assoc(mysqli_query($conn, "SELECT `timestamp` FROM `windspeed` ORDER BY `timestamp` DESC LIMIT 1"));
 
-require(APP_BASE_PATH . '/fcn/weather/getCurrentWeatherData.php');
-$getCurrent = new getCurrentWeatherData();
-$array['current']	= (array) $getCurrent->getConditions();
-$array['current']['timestamp'] = $result['timestamp'];
+// Conditional GET: the payload only changes with a new observation, a new
+// tower reading, the day rolling over (archive sections) or the hour (moon).
+$towers = ($config->station->towers === true && array_intersect(['current', 'towers'], $sections));
+$validators = [$result['timestamp'], implode(',', $sections), isset($_GET['json']) || isset($_GET['JSON']), $units];
+$lastModified = strtotime($result['timestamp']);
+if ($towers) {
+	$towerResult = mysqli_fetch_assoc(mysqli_query($conn, "SELECT MAX(`timestamp`) AS `timestamp` FROM `tower_data`"));
+	$validators[] = $towerResult['timestamp'];
+	$lastModified = max($lastModified, strtotime($towerResult['timestamp']));
+}
+if (array_diff($sections, ['current', 'moon', 'towers'])) {
+	$validators[] = date('Y-m-d');
+	$lastModified = max($lastModified, strtotime('today'));
+}
+if (in_array('moon', $sections)) {
+	$validators[] = date('Y-m-d H');
+	$lastModified = max($lastModified, strtotime(date('Y-m-d H:00:00')));
+}
+$etag = '"' . md5(implode('|', $validators)) . '"';
+
+header('Cache-Control: no-cache');
+header('ETag: ' . $etag);
+header('Last-Modified: ' . gmdate('D, d M Y H:i:s', $lastModified) . ' GMT');
+
+if (isset($_SERVER['HTTP_IF_NONE_MATCH'])) {
+	$notModified = in_array($etag, array_map('trim', explode(',', $_SERVER['HTTP_IF_NONE_MATCH'])))
+		|| trim($_SERVER['HTTP_IF_NONE_MATCH']) === '*';
+} elseif (isset($_SERVER['HTTP_IF_MODIFIED_SINCE'])) {
+	$notModified = strtotime($_SERVER['HTTP_IF_MODIFIED_SINCE']) >= $lastModified;
+} else {
+	$notModified = false;
+}
+if ($notModified) {
+	http_response_code(304);
+	die();
+}
+
+// Archive sections are cached, keyed on the period they cover so a
+// day/week/month/year rollover always starts a fresh entry.
+$archiveSections = [
+	'yesterday'  => ['method' => 'getYesterday', 'period' => 'Y-m-d', 'ttl' => 86400,   'today' => false],
+	'this_week'  => ['method' => 'getWeek',      'period' => 'o-W',   'ttl' => 300,     'today' => true],
+	'this_month' => ['method' => 'getMonth',     'period' => 'Y-m',   'ttl' => 900,     'today' => true],
+	'last_month' => ['method' => 'getLastMonth', 'period' => 'Y-m',   'ttl' => 2764800, 'today' => false],
+	'this_year'  => ['method' => 'getYear',      'period' => 'Y',     'ttl' => 3600,    'today' => true],
+	'all_time'   => ['method' => 'getAllTime',   'period' => '',      'ttl' => 3600,    'today' => true],
+];
+
+// Current value => archive high/low fields it can set a new record for.
+$recordFields = [
+	'tempF'         => ['tempF_high', 'tempF_low'],
+	'windSmph'      => ['windS_mph_high', null],
+	'pressure_inHg' => ['pressure_inHg_high', 'pressure_inHg_low'],
+	'relH'          => ['relH_high', 'relH_low'],
+	'rainIN'        => ['rainfall_IN_most', null],
+];
+
+function cacheDir()
+{
+	return sys_get_temp_dir() . '/acuparse-data-cache';
+}
+
+function cacheFetch($key)
+{
+	if (function_exists('apcu_enabled') && apcu_enabled()) {
+		$value = apcu_fetch($key, $success);
+		return $success ? $value : null;
+	}
+	$file = cacheDir() . '/' . $key;
+	if (!is_file($file)) {
+		return null;
+	}
+	// JSON, not serialize(), the directory may be shared with other users
+	$entry = json_decode(@file_get_contents($file), true);
+	if (!is_array($entry) || !isset($entry['expires'], $entry['value']) || $entry['expires'] < time()) {
+		return null;
+	}
+	return $entry['value'];
+}
+
+function cacheStore($key, $value, $ttl)
+{
+	if (function_exists('apcu_enabled') && apcu_enabled()) {
+		apcu_store($key, $value, $ttl);
+		return;
+	}
+	$dir = cacheDir();
+	if (!is_dir($dir)) {
+		@mkdir($dir, 0700, true);
+	}
+	$tmp = tempnam($dir, 'tmp');
+	if ($tmp === false) {
+		return;
+	}
+	if (@file_put_contents($tmp, json_encode(['expires' => time() + $ttl, 'value' => $value])) === false
+		|| !@rename($tmp, $dir . '/' . $key)) {
+		@unlink($tmp);
+	}
+}
+
+// True when the current conditions beat a high or low stored in the cached section.
+function isNewRecord($current, $archive, $recordFields)
+{
+	$archive = (array) $archive;
+	foreach ($recordFields as $field => $limits) {
+		if (!isset($current[$field]) || !is_numeric($current[$field])) {
+			continue;
+		}
+		list($high, $low) = $limits;
+		if (isset($archive[$high]) && is_numeric($archive[$high]) && $current[$field] > $archive[$high]) {
+			return true;
+		}
+		if ($low !== null && isset($archive[$low]) && is_numeric($archive[$low]) && $current[$field] < $archive[$low]) {
+			return true;
+		}
+	}
+	return false;
+}
+
+// Imperial field => metric field, for the current and archive sections.
+$unitFields = [
+	'tempF'              => 'tempC',
+	'feelsF'             => 'feelsC',
+	'dewptF'             => 'dewptC',
+	'tempF_high'         => 'tempC_high',
+	'tempF_low'          => 'tempC_low',
+	'tempF_avg'          => 'tempC_avg',
+	'pressure_inHg'      => 'pressure_kPa',
+	'pressure_inHg_high' => 'pressure_kPa_high',
+	'pressure_inHg_low'  => 'pressure_kPa_low',
+	'windSmph'           => 'windSkmh',
+	'windSmph_avg2'      => 'windSkmh_avg2',
+	'windSmph_avg10'     => 'windSkmh_avg10',
+	'windSmph_peak'      => 'windSkmh_peak',
+	'windSmph_max5'      => 'windSkmh_max5',
+	'windS_mph_high'     => 'windS_kmh_high',
+	'rainIN'             => 'rainMM',
+	'rainTotalIN_today'  => 'rainTotalMM_today',
+	'rainfall_IN_most'   => 'rainfall_MM_most',
+	'rainfall_IN_total'  => 'rainfall_MM_total',
+];
+
+// $array without the fields of the unit system that was not asked for.
+function singleUnits($array, $units, $unitFields)
+{
+	$drop = array_flip($units === 'imperial' ? array_values($unitFields) : array_keys($unitFields));
+	foreach ($array as $section => $fields) {
+		if (!in_array($section, ['moon', 'towers'])) {
+			$array[$section] = array_diff_key((array) $fields, $drop);
+		}
+	}
+	return $array;
+}
+
+// Fields of $new that differ from $base, and fields of $base no longer in $new, by section.
+function payloadDelta($base, $new)
+{
+	$changed = [];
+	$removed = [];
+	foreach ($new as $section => $fields) {
+		$fields = (array) $fields;
+		if (!isset($base[$section])) {
+			$changed[$section] = $fields;
+			continue;
+		}
+		$old = (array) $base[$section];
+		foreach ($fields as $field => $value) {
+			if (!array_key_exists($field, $old) || $old[$field] !== $value) {
+				$changed[$section][$field] = $value;
+			}
+		}
+		$gone = array_keys(array_diff_key($old, $fields));
+		if ($gone) {
+			$removed[$section] = $gone;
+		}
+	}
+	return ['changed' => (object) $changed, 'removed' => (object) $removed];
+}
+
+// Query durations in ms for the Server-Timing header.
+$timings = [];
+function timeSince($start)
+{
+	return round((microtime(true) - $start) * 1000, 1);
+}
+
+$cached = [];
+$needsCurrent = in_array('current', $sections);
+foreach ($archiveSections as $section => $policy) {
+	if (in_array($section, $sections)) {
+		$key = 'acuparse_data_' . $section . '_' . date($policy['period']);
+		$cached[$section] = ['key' => $key, 'value' => cacheFetch($key)];
+		if ($cached[$section]['value'] !== null && $policy['today']) {
+			$needsCurrent = true;
+		}
+	}
+}
 
-require(APP_BASE_PATH . '/fcn/weather/getArchiveWeatherData.php');
-$getArchive = new getArchiveWeatherData();
-$array['yesterday']	= $getArchive->getYesterday();
-$array['this_week']	= $getArchive->getWeek();
-$array['this_month']	= $getArchive->getMonth();
-$array['last_month']	= $getArchive->getLastMonth();
-$array['this_year']	= $getArchive->getYear();
-$array['all_time']	= $getArchive->getAllTime();
+if ($needsCurrent) {
+	$start = microtime(true);
+	require(APP_BASE_PATH . '/fcn/weather/getCurrentWeatherData.php');
+	$getCurrent = new getCurrentWeatherData();
+	$current = (array) $getCurrent->getConditions();
+	$current['timestamp'] = $result['timestamp'];
+	if (in_array('current', $sections)) {
+		$array['current'] = $current;
+	}
+	$timings['current'] = timeSince($start);
+}
+
+$getArchive = null;
+foreach ($cached as $section => $entry) {
+	$start = microtime(true);
+	$policy = $archiveSections[$section];
+	$value = $entry['value'];
+	if ($value !== null && $policy['today'] && isNewRecord($current, $value, $recordFields)) {
+		$value = null;
+	}
+	if ($value === null) {
+		if ($getArchive === null) {
+			require(APP_BASE_PATH . '/fcn/weather/getArchiveWeatherData.php');
+			$getArchive = new getArchiveWeatherData();
+		}
+		$method = $policy['method'];
+		$value = $getArchive->$method();
+		// a failed query is not kept for the whole period
+		if ($value && (array) $value) {
+			cacheStore($entry['key'], $value, $policy['ttl']);
+		}
+	}
+	$array[$section] = $value;
+	$timings[$section] = timeSince($start);
+}
 
 // Get Moon Data:
-require(APP_BASE_PATH . '/pub/lib/mit/moon/moonphase.php');
-$getMoon = new MoonPhase();
-$moon['age'] = round($getMoon->age(), 1);
-$moon['stage'] = $getMoon->phase_name();
-$moon['next_new'] = date('j M @ H:i', $getMoon->next_new_moon());
-$moon['next_full'] = date('j M @ H:i', $getMoon->next_full_moon());
-$moon['last_new'] = date('j M @ H:i', $getMoon->new_moon());
-$moon['last_full'] = date('j M @ H:i', $getMoon->full_moon());
-$moon['distance'] = $getMoon->distance();
-$moon['illumination'] = round($getMoon->illumination()*100, 0);
-$moon['icon_url'] = "/local/moon/" . (round($getMoon->age(), 0)) . ".gif";
-$moon['timestamp'] = $result['timestamp'];
+if (in_array('moon', $sections)) {
+	$start = microtime(true);
+	require(APP_BASE_PATH . '/pub/lib/mit/moon/moonphase.php');
+	$getMoon = new MoonPhase();
+	$moon['age'] = round($getMoon->age(), 1);
+	$moon['stage'] = $getMoon->phase_name();
+	$moon['next_new'] = date('j M @ H:i', $getMoon->next_new_moon());
+	$moon['next_full'] = date('j M @ H:i', $getMoon->next_full_moon());
+	$moon['last_new'] = date('j M @ H:i', $getMoon->new_moon());
+	$moon['last_full'] = date('j M @ H:i', $getMoon->full_moon());
+	$moon['distance'] = $getMoon->distance();
+	$moon['illumination'] = round($getMoon->illumination()*100, 0);
+	$moon['icon_url'] = "/local/moon/" . (round($getMoon->age(), 0)) . ".gif";
+	$moon['timestamp'] = $result['timestamp'];
 
 
-$array['moon'] = $moon;
+	$array['moon'] = $moon;
+	$timings['moon'] = timeSince($start);
+}
 
-if ($config->station->towers === true) {
-	$result = mysqli_query($conn, "SELECT * FROM `towers` ORDER BY `arrange`");
+if ($towers) {
+	$start = microtime(true);
+	// Latest reading for every tower in one query, see sql/data_indexes.sql for the supporting index.
+	$result = mysqli_query($conn, "SELECT `towers`.`sensor`, `towers`.`name`, `tower_data`.`tempF`, `tower_data`.`relH`, `tower_data`.`timestamp`
+		FROM `towers`
+		LEFT JOIN (SELECT `sensor`, MAX(`timestamp`) AS `timestamp` FROM `tower_data` GROUP BY `sensor`) AS `latest` ON `latest`.`sensor` = `towers`.`sensor`
+		LEFT JOIN `tower_data` ON `tower_data`.`sensor` = `latest`.`sensor` AND `tower_data`.`timestamp` = `latest`.`timestamp`
+		ORDER BY `towers`.`arrange`");
 
+	if (in_array('towers', $sections)) {
+		$array['towers'] = [];
+	}
 	if (is_object($result) && $result->num_rows > 0)
 	{
 		while($row = mysqli_fetch_assoc($result))
 		{
-			$sensorID   = $row['sensor'];
+			if (in_array('towers', $sections)) {
+				$array['towers'][$row['sensor']] = [
+					'name'      => $row['name'],
+					'tempF'     => $row['tempF'] === null ? null : (float) $row['tempF'],
+					'relH'      => $row['relH'] === null ? null : (int) $row['relH'],
+					'timestamp' => $row['timestamp'],
+				];
+				continue;
+			}
+
 			$sensorName = $row['name'];
 
-			$result2 = mysqli_fetch_assoc(mysqli_query($conn, "SELECT * FROM `tower_data` WHERE `sensor` = '$sensorID' ORDER BY `timestamp` DESC LIMIT 1"));
- 
- 			$sensorArray = [];
+			$sensorArray = [];
 
-			$sensorArray['tempF']	  = $result2['tempF'];
-			$sensorArray['relH']	  = $result2['relH'];
-			$sensorArray['timestamp'] = $result2['timestamp'];
+			$sensorArray['tempF']	  = $row['tempF'];
+			$sensorArray['relH']	  = $row['relH'];
+			$sensorArray['timestamp'] = $row['timestamp'];
 
 			$array['current'][$sensorName] = $sensorArray;
 		}
 	}
+	if (isset($array['towers'])) {
+		// an object even without towers
+		$array['towers'] = (object) $array['towers'];
+	}
+	$timings['towers'] = timeSince($start);
+}
+
+$serverTiming = [];
+foreach ($timings as $name => $duration) {
+	$serverTiming[] = $name . ';dur=' . $duration;
+}
+if ($serverTiming) {
+	header('Server-Timing: ' . implode(', ', $serverTiming));
+}
+
+if ($units !== null) {
+	$array = singleUnits($array, $units, $unitFields);
 }
 
 if(!isset($_GET['json']) && !isset($_GET['JSON']))
@@ -69,7 +339,32 @@ if(!isset($_GET['json']) && !isset($_GET['JSON']))
 }
 else
 {
-	echo json_encode($array);
+	// Every payload gets a version. The last few versions for this set of
+	// sections are kept so a client sending ?since=<version> only gets the
+	// fields that changed since then.
+	$version = substr(md5(json_encode($array)), 0, 16);
+	header('X-Acuparse-Version: ' . $version);
+
+	$versionsKey = 'acuparse_data_versions_' . md5(implode(',', $sections) . '|' . $units);
+	$versions = cacheFetch($versionsKey);
+	if (!is_array($versions)) {
+		$versions = [];
+	}
+	$since = isset($_GET['since']) ? $_GET['since'] : null;
+	$base = ($since !== null && isset($versions[$since])) ? $versions[$since] : null;
+
+	if (!isset($versions[$version])) {
+		$versions[$version] = $array;
+		$versions = array_slice($versions, -5, null, true);
+		cacheStore($versionsKey, $versions, 3600);
+	}
+
+	if ($base === null) {
+		echo json_encode($array);
+	} else {
+		header('X-Acuparse-Delta: ' . $since);
+		echo json_encode(payloadDelta($base, $array));
+	}
 }
 die();
 ?>
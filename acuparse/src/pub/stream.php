@@ -0,0 +1,84 @@
+<?php
+/*
+ * Server-Sent Events stream of the current conditions.
+ *
+ * Checks the latest windspeed and tower_data timestamps every second and
+ * sends a `current` event, holding the same fields as the `current`
+ * section of data.php, whenever a new reading has landed. The stream is
+ * closed after a few minutes, clients are expected to reconnect.
+ */
+require(dirname(__DIR__) . '/inc/loader.php');
+require(APP_BASE_PATH . '/fcn/weather/getCurrentWeatherData.php');
+
+const STREAM_POLL_SECONDS = 1;
+const STREAM_KEEPALIVE_SECONDS = 15;
+const STREAM_LIFETIME_SECONDS = 300;
+
+// don't hold the session lock for the life of the stream
+if (session_status() === PHP_SESSION_ACTIVE) {
+	session_write_close();
+}
+set_time_limit(STREAM_LIFETIME_SECONDS + 30);
+ignore_user_abort(false);
+
+header('Content-Type: text/event-stream');
+header('Cache-Control: no-cache');
+header('X-Accel-Buffering: no');
+while (ob_get_level() > 0) {
+	ob_end_flush();
+}
+
+$towers = ($config->station->towers === true);
+$lastEventID = isset($_SERVER['HTTP_LAST_EVENT_ID']) ? $_SERVER['HTTP_LAST_EVENT_ID'] : null;
+$started = time();
+$lastSent = time();
+
+echo "retry: 5000\n\n";
+flush();
+
+while (!connection_aborted() && time() - $started < STREAM_LIFETIME_SECONDS) {
+	$result = mysqli_fetch_assoc(mysqli_query($conn, "SELECT `timestamp` FROM `windspeed` ORDER BY `timestamp` DESC LIMIT 1"));
+	$eventID = $result['timestamp'];
+	if ($towers) {
+		$towerResult = mysqli_fetch_assoc(mysqli_query($conn, "SELECT MAX(`timestamp`) AS `timestamp` FROM `tower_data`"));
+		$eventID .= '|' . $towerResult['timestamp'];
+	}
+	$eventID = md5($eventID);
+
+	if ($eventID !== $lastEventID) {
+		$getCurrent = new getCurrentWeatherData();
+		$current = (array) $getCurrent->getConditions();
+		$current['timestamp'] = $result['timestamp'];
+
+		if ($towers) {
+			// Latest reading for every tower in one query, as in data.php.
+			$towerRows = mysqli_query($conn, "SELECT `towers`.`sensor`, `towers`.`name`, `tower_data`.`tempF`, `tower_data`.`relH`, `tower_data`.`timestamp`
+				FROM `towers`
+				LEFT JOIN (SELECT `sensor`, MAX(`timestamp`) AS `timestamp` FROM `tower_data` GROUP BY `sensor`) AS `latest` ON `latest`.`sensor` = `towers`.`sensor`
+				LEFT JOIN `tower_data` ON `tower_data`.`sensor` = `latest`.`sensor` AND `tower_data`.`timestamp` = `latest`.`timestamp`
+				ORDER BY `towers`.`arrange`");
+			while (is_object($towerRows) && $row = mysqli_fetch_assoc($towerRows)) {
+				$current[$row['name']] = [
+					'tempF'     => $row['tempF'],
+					'relH'      => $row['relH'],
+					'timestamp' => $row['timestamp'],
+				];
+			}
+		}
+
+		echo "id: " . $eventID . "\n";
+		echo "event: current\n";
+		echo "data: " . json_encode($current) . "\n\n";
+		flush();
+		$lastEventID = $eventID;
+		$lastSent = time();
+	} elseif (time() - $lastSent >= STREAM_KEEPALIVE_SECONDS) {
+		echo ": keepalive\n\n";
+		flush();
+		$lastSent = time();
+	}
+
+	sleep(STREAM_POLL_SECONDS);
+}
+die();
+?>
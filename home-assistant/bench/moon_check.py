@@ -0,0 +1,110 @@
+"""
+Compare the moon section calculated by the component with data.php.
+
+Fetches data?json&sections=moon from an Acuparse server and checks every
+field against custom_components/acuparse/moon.py for the same minute. Run
+it on a host set to the same time zone as the Acuparse server, the phase
+times are formatted in local time on both sides.
+
+	python moon_check.py acuparse.example.com
+
+Without a hostname, prints the local values for the next --days days
+instead, one line per day, to compare with a PHP MoonPhase run by hand.
+"""
+import argparse
+from datetime import datetime
+import json
+import os
+import sys
+import time
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.acuparse.moon import MONTHS, MoonCalculator  # noqa: E402
+
+# Largest accepted difference per field
+TOLERANCE = {
+	'age': 0.1,
+	'illumination': 1,
+	'distance': 50,
+}
+# Phase times, in seconds
+TIME_TOLERANCE = 60
+TIME_FIELDS = ('next_new', 'next_full', 'last_new', 'last_full')
+
+
+def parse_time(value, near):
+	"""Parse a 'j M @ H:i' time, picking the year closest to near."""
+	day, month, _, clock = value.split()
+	hour, minute = clock.split(':')
+	candidates = [datetime(year, MONTHS.index(month) + 1, int(day), int(hour), int(minute))
+				  for year in (near.year - 1, near.year, near.year + 1)]
+	return min(candidates, key=lambda candidate: abs((candidate - near).total_seconds()))
+
+
+def compare(remote, local, now):
+	"""Return a list of (field, remote, local, ok) rows."""
+	rows = []
+	for field in sorted(set(remote) | set(local)):
+		if field == 'timestamp':
+			continue
+		remote_value, local_value = remote.get(field), local.get(field)
+		if field in TOLERANCE:
+			try:
+				ok = abs(float(remote_value) - float(local_value)) <= TOLERANCE[field]
+			except (TypeError, ValueError):
+				ok = False
+		elif field in TIME_FIELDS:
+			try:
+				difference = parse_time(remote_value, now) - parse_time(local_value, now)
+				ok = abs(difference.total_seconds()) <= TIME_TOLERANCE
+			except (AttributeError, ValueError):
+				ok = False
+		elif field == 'icon_url':
+			# the icon follows the rounded age, allow the neighbouring one
+			try:
+				remote_age = int(remote_value.rsplit('/', 1)[1].split('.')[0])
+				local_age = int(local_value.rsplit('/', 1)[1].split('.')[0])
+				ok = abs(remote_age - local_age) <= 1
+			except (AttributeError, IndexError, ValueError):
+				ok = False
+		else:
+			ok = remote_value == local_value
+		rows.append((field, remote_value, local_value, ok))
+	return rows
+
+
+def check(hostname):
+	"""Compare with the server, returns True when every field matches."""
+	with urlopen('http://{}/data?json&sections=moon'.format(hostname)) as response:
+		remote = json.loads(response.read().decode('utf-8'))['moon']
+	now = time.time()
+	local = MoonCalculator().moon_data(now)
+
+	print('{:<14} {:>22} {:>22}'.format('field', 'data.php', 'local'))
+	matched = True
+	for field, remote_value, local_value, ok in compare(remote, local, datetime.fromtimestamp(now)):
+		matched = matched and ok
+		print('{:<14} {:>22} {:>22}  {}'.format(field, str(remote_value), str(local_value), 'ok' if ok else 'MISMATCH'))
+	return matched
+
+
+def table(days):
+	"""Print the local values at midnight for a number of days."""
+	calculator = MoonCalculator()
+	start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+	for day in range(days):
+		data = calculator.moon_data(start + day * 86400)
+		print('{timestamp}  age {age:>4}  {illumination:>3}%  {distance:>6} km  {stage:<16} '
+			  'new {last_new} / {next_new}  full {last_full} / {next_full}'.format(**data))
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('hostname', nargs='?', help='Acuparse hostname, as in the component configuration')
+	parser.add_argument('--days', type=int, default=30)
+	args = parser.parse_args()
+	if args.hostname:
+		sys.exit(0 if check(args.hostname) else 1)
+	table(args.days)
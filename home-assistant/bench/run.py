@@ -0,0 +1,218 @@
+"""
+Benchmark the Acuparse component against stand-in servers.
+
+Drives AcuparseData and AcuparseSensor in a real HomeAssistant instance
+against bench/server.py and reports, per update cycle, the latency
+(p50/p99), CPU time, longest event loop block, allocated memory and state
+writes, for several sensor counts and stations.
+
+	python run.py --stations 1,5 --sensors 1,50,all --cycles 200 --towers 10
+
+Save the results with --save-baseline baseline.json, and compare later runs
+with --baseline baseline.json: the run exits with status 1 when a result is
+worse than the baseline by more than --tolerance (plus --slack, for the
+timings that are close to zero).
+
+Needs homeassistant and aiohttp installed, and Python 3.9 or newer for
+--allocations.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.acuparse import sensor as acuparse  # noqa: E402
+from server import StandInServer  # noqa: E402
+
+
+# Results compared with the baseline, all lower is better
+COMPARED = ('p50_ms', 'p99_ms', 'cpu_ms', 'block_ms', 'alloc_kib', 'writes')
+
+
+def percentile(samples, fraction):
+	ordered = sorted(samples)
+	return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class LoopMonitor:
+	"""Measure the longest time the event loop was blocked."""
+
+	INTERVAL = 0.001
+
+	def __init__(self):
+		self.longest = 0.0
+		self._task = None
+
+	async def _run(self):
+		while True:
+			start = time.perf_counter()
+			await asyncio.sleep(self.INTERVAL)
+			self.longest = max(self.longest, time.perf_counter() - start - self.INTERVAL)
+
+	def start(self):
+		self._task = asyncio.ensure_future(self._run())
+
+	def reset(self):
+		longest, self.longest = self.longest, 0.0
+		return longest
+
+	def stop(self):
+		self._task.cancel()
+
+
+async def bench(hass, server, port, stations, sensors, cycles, allocations):
+	"""Run one benchmark, returns the result row."""
+	conditions = list(acuparse.SENSOR_TYPES)[:sensors]
+	rests = []
+	entities = []
+	for index in range(stations):
+		hostname = '127.0.0.1:{}/s{}-{}'.format(port, sensors, index)
+		rest = acuparse.AcuparseData(hass, hostname, acuparse.MIN_REFRESH)
+		rests.append(rest)
+		for condition in conditions:
+			entity = acuparse.AcuparseSensor(hass, rest, condition, 'bench.{}'.format(hostname),
+											 'station {}'.format(index))
+			entity.hass = hass
+			entities.append(entity)
+
+	await asyncio.gather(*(rest.async_update() for rest in rests))
+	for entity in entities:
+		await entity.async_added_to_hass()
+		await entity.async_update_ha_state()
+	await hass.async_block_till_done()
+
+	writes = []
+	remove = hass.bus.async_listen(EVENT_STATE_CHANGED, lambda event: writes.append(1))
+	monitor = LoopMonitor()
+	monitor.start()
+	latencies, cpu, blocked, allocated, written = [], [], [], [], []
+	for _ in range(cycles):
+		server.observe()
+		monitor.reset()
+		del writes[:]
+		if allocations:
+			tracemalloc.reset_peak()
+			base = tracemalloc.get_traced_memory()[0]
+		start, start_cpu = time.perf_counter(), time.process_time()
+		await asyncio.gather(*(rest._async_poll() for rest in rests))
+		await hass.async_block_till_done()
+		latencies.append(time.perf_counter() - start)
+		cpu.append(time.process_time() - start_cpu)
+		blocked.append(monitor.reset())
+		if allocations:
+			allocated.append(tracemalloc.get_traced_memory()[1] - base)
+		written.append(len(writes))
+		for rest in rests:
+			# _async_poll schedules the next poll, the benchmark drives them itself
+			rest.async_stop()
+	monitor.stop()
+	remove()
+
+	for entity in entities:
+		await entity.async_will_remove_from_hass()
+	return {
+		'stations': stations,
+		'sensors': len(conditions),
+		'p50_ms': percentile(latencies, 0.5) * 1000,
+		'p99_ms': percentile(latencies, 0.99) * 1000,
+		'cpu_ms': sum(cpu) / cycles * 1000,
+		'block_ms': max(blocked) * 1000,
+		'alloc_kib': (sum(allocated) / cycles / 1024) if allocated else None,
+		'writes': sum(written) / cycles,
+		'skipped': sum(rest.skipped_writes for rest in rests) / cycles,
+	}
+
+
+def regressions(results, baseline, tolerance, slack):
+	"""Return a description of every result worse than its baseline."""
+	found = []
+	for key, result in results.items():
+		if key not in baseline:
+			continue
+		for metric in COMPARED:
+			new, old = result.get(metric), baseline[key].get(metric)
+			if new is None or old is None:
+				continue
+			limit = old * (1 + tolerance) + slack
+			if new > limit:
+				found.append('{} {}: {:.2f}, baseline {:.2f} (limit {:.2f})'.format(key, metric, new, old, limit))
+	return found
+
+
+async def main(args):
+	sensor_counts = [len(acuparse.SENSOR_TYPES) if count == 'all' else int(count)
+					 for count in args.sensors.split(',')]
+	station_counts = [int(count) for count in args.stations.split(',')]
+
+	payload = None
+	if args.payload:
+		with open(args.payload) as payload_file:
+			payload = json.load(payload_file)
+	server = StandInServer(payload, args.towers, args.latency / 1000, args.jitter / 1000, args.errors)
+	port = await server.start()
+
+	hass = HomeAssistant()
+	hass.config.config_dir = tempfile.mkdtemp()
+	await hass.async_start()
+	if args.allocations:
+		tracemalloc.start()
+
+	header = '{:>8} {:>8} {:>9} {:>9} {:>9} {:>9} {:>10} {:>8} {:>8}'
+	print(header.format('stations', 'sensors', 'p50 ms', 'p99 ms', 'cpu ms', 'block ms', 'alloc KiB', 'writes', 'skipped'))
+	row = '{stations:>8} {sensors:>8} {p50_ms:>9.2f} {p99_ms:>9.2f} {cpu_ms:>9.2f} {block_ms:>9.2f} {alloc:>10} {writes:>8.1f} {skipped:>8.1f}'
+	results = {}
+	for stations in station_counts:
+		for sensors in sensor_counts:
+			result = await bench(hass, server, port, stations, sensors, args.cycles, args.allocations)
+			alloc = '-' if result['alloc_kib'] is None else '{:.1f}'.format(result['alloc_kib'])
+			print(row.format(alloc=alloc, **result))
+			results['{}x{}'.format(stations, result['sensors'])] = result
+	print('(per update cycle over {} cycles, requests: {}, 304: {}, errors: {})'.format(
+		args.cycles,
+		sum(station.requests for station in server.stations.values()),
+		sum(station.not_modified for station in server.stations.values()),
+		sum(station.errors for station in server.stations.values())))
+
+	await hass.async_stop()
+	await server.stop()
+
+	if args.save_baseline:
+		with open(args.save_baseline, 'w') as baseline_file:
+			json.dump(results, baseline_file, indent=1, sort_keys=True)
+	if args.baseline:
+		with open(args.baseline) as baseline_file:
+			baseline = json.load(baseline_file)
+		found = regressions(results, baseline, args.tolerance, args.slack)
+		for regression in found:
+			print('REGRESSION', regression)
+		if found:
+			return 1
+		print('No regressions against {}'.format(args.baseline))
+	return 0
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--stations', default='1', help='comma separated station counts')
+	parser.add_argument('--sensors', default='1,50,all', help='comma separated sensor counts, all for every SENSOR_TYPES')
+	parser.add_argument('--cycles', type=int, default=200)
+	parser.add_argument('--payload', help='recorded data?json payload to serve')
+	parser.add_argument('--towers', type=int, default=0)
+	parser.add_argument('--latency', type=float, default=0, help='server latency in ms')
+	parser.add_argument('--jitter', type=float, default=0, help='random extra server latency in ms')
+	parser.add_argument('--errors', type=float, default=0, help='fraction of requests answered with 500')
+	parser.add_argument('--allocations', action='store_true', help='trace allocations (slows everything down)')
+	parser.add_argument('--save-baseline', metavar='FILE', help='save the results as a baseline')
+	parser.add_argument('--baseline', metavar='FILE', help='fail when the results are worse than this baseline')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='allowed fraction above the baseline')
+	parser.add_argument('--slack', type=float, default=0.5, help='allowed amount above the baseline, in its units')
+	sys.exit(asyncio.get_event_loop().run_until_complete(main(parser.parse_args())))
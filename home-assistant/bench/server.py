@@ -0,0 +1,232 @@
+"""
+Stand-in Acuparse server for benchmarks.
+
+Serves /<station>/data?json like data.php, from a recorded payload or a
+synthetic one, with configurable latency, error rate and tower count.
+Supports the sections and units parameters and conditional GET (ETag).
+
+Run on its own with:
+	python server.py --port 8099 --towers 10 --latency 50
+then point the component at hostname 127.0.0.1:8099/home
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+SECTIONS = ['current', 'yesterday', 'this_week', 'this_month', 'last_month', 'this_year', 'all_time', 'moon', 'towers']
+ARCHIVE_SECTIONS = SECTIONS[1:7]
+# towers is only sent when asked for, as in data.php
+DEFAULT_SECTIONS = SECTIONS[:8]
+# imperial field => metric field, as in data.php
+UNIT_FIELDS = {
+	'tempF': 'tempC', 'feelsF': 'feelsC', 'dewptF': 'dewptC', 'tempF_high': 'tempC_high',
+	'tempF_low': 'tempC_low', 'tempF_avg': 'tempC_avg', 'pressure_inHg': 'pressure_kPa',
+	'pressure_inHg_high': 'pressure_kPa_high', 'pressure_inHg_low': 'pressure_kPa_low',
+	'windSmph': 'windSkmh', 'windSmph_avg2': 'windSkmh_avg2', 'windSmph_avg10': 'windSkmh_avg10',
+	'windSmph_peak': 'windSkmh_peak', 'windSmph_max5': 'windSkmh_max5', 'windS_mph_high': 'windS_kmh_high',
+	'rainIN': 'rainMM', 'rainTotalIN_today': 'rainTotalMM_today', 'rainfall_IN_most': 'rainfall_MM_most',
+	'rainfall_IN_total': 'rainfall_MM_total',
+}
+
+
+def _time(when):
+	return when.strftime('%H:%M')
+
+
+def synthetic_payload(towers=0, now=None):
+	"""Return a payload with every field data.php sends."""
+	now = now or datetime.now().replace(microsecond=0)
+	timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+	current = {
+		'tempF': 68.2, 'tempC': 20.1, 'tempF_trend': 'Steady', 'feelsF': 68.2, 'feelsC': 20.1,
+		'dewptF': 50.1, 'dewptC': 10.1, 'tempF_high': 75.3, 'tempC_high': 24.1,
+		'high_temp_recorded': '14:02', 'tempF_low': 55.0, 'tempC_low': 12.8,
+		'low_temp_recorded': '05:41', 'tempF_avg': 64.9, 'tempC_avg': 18.3,
+		'relH': 52, 'relH_trend': 'Falling', 'pressure_inHg': 29.92, 'pressure_kPa': 101.32,
+		'inHg_trend': 'Rising', 'windSmph': 5, 'windSkmh': 8, 'windDIR': 'SW', 'windDEG': 225,
+		'windDEG_avg2': 220, 'windDIR_avg2': 'SW', 'windSmph_avg2': 4, 'windSkmh_avg2': 6,
+		'windDEG_avg10': 215, 'windSmph_avg10': 4, 'windSkmh_avg10': 6,
+		'windDEG_peak': 240, 'windDIR_peak': 'WSW', 'wind_recorded_peak': '13:12',
+		'windSmph_peak': 19, 'windSkmh_peak': 31, 'windSmph_max5': 9, 'windSkmh_max5': 14,
+		'rainIN': 0.0, 'rainMM': 0.0, 'rainTotalIN_today': 0.12, 'rainTotalMM_today': 3.05,
+		'timestamp': timestamp,
+	}
+	for n in range(1, towers + 1):
+		current['Tower {}'.format(n)] = {'tempF': 60 + n % 20, 'relH': 40 + n % 50, 'timestamp': timestamp}
+
+	payload = {'current': current}
+	payload['towers'] = {
+		'{:08d}'.format(n): {'name': 'Tower {}'.format(n), 'tempF': 60 + n % 20, 'relH': 40 + n % 50,
+							 'timestamp': timestamp}
+		for n in range(1, towers + 1)}
+	for index, section in enumerate(ARCHIVE_SECTIONS):
+		spread = index + 1
+		payload[section] = {
+			'tempF_high': 75 + spread, 'tempC_high': 23.9 + spread, 'tempF_low': 40 - spread,
+			'tempC_low': 4.4 - spread, 'tempF_high_recorded': 'Jul 4 @ 14:02',
+			'tempF_low_recorded': 'Jan 2 @ 06:10', 'windS_mph_high': 20 + spread,
+			'windS_kmh_high': 32 + spread, 'windDIR': 'NW', 'windS_mph_high_recorded': 'Mar 3 @ 17:45',
+			'pressure_inHg_high': 30.4, 'pressure_inHg_low': 29.3, 'pressure_kPa_high': 102.9,
+			'pressure_kPa_low': 99.2, 'pressure_inHg_high_recorded': 'Feb 1 @ 09:00',
+			'pressure_inHg_low_recorded': 'Apr 9 @ 03:30', 'relH_high': 99, 'relH_low': 12,
+			'relH_high_recorded': 'May 5 @ 05:05', 'relH_low_recorded': 'Aug 8 @ 15:15',
+			'rainfall_IN_most': 1.2, 'rainfall_MM_most': 30.5,
+			'rainfall_IN_most_recorded': 'Jun 6 @ 16:20', 'rainfall_IN_total': 3.4 * spread,
+			'rainfall_MM_total': 86.4 * spread,
+		}
+	payload['all_time']['rainfall_IN_total_since'] = '2017-04-01'
+	payload['moon'] = {
+		'age': 12.3, 'stage': 'Waxing Gibbous', 'next_new': '2 Nov @ 12:47',
+		'next_full': '18 Oct @ 01:38', 'last_new': '3 Oct @ 05:49', 'last_full': '18 Sep @ 15:34',
+		'distance': 389000, 'illumination': 93, 'icon_url': '/local/moon/12.gif', 'timestamp': timestamp,
+	}
+	return payload
+
+
+class Station:
+	"""State of one stand-in station."""
+
+	def __init__(self, payload, towers):
+		self.payload = copy.deepcopy(payload)
+		self.towers = towers
+		self.observed = datetime.now().replace(microsecond=0)
+		self.requests = 0
+		self.not_modified = 0
+		self.errors = 0
+
+	def observe(self, interval=timedelta(seconds=18)):
+		"""Record a new observation, changing a few current values."""
+		self.observed += interval
+		timestamp = self.observed.strftime('%Y-%m-%d %H:%M:%S')
+		current = self.payload['current']
+		current['timestamp'] = timestamp
+		current['windSmph'] = random.randint(0, 20)
+		current['windSkmh'] = round(current['windSmph'] * 1.609)
+		current['windDEG'] = random.randrange(0, 360, 5)
+		current['tempF'] = round(current['tempF'] + random.choice((-0.1, 0, 0.1)), 1)
+		current['tempC'] = round((current['tempF'] - 32) * 5 / 9, 1)
+		for n in range(1, self.towers + 1):
+			tower = current.get('Tower {}'.format(n))
+			if tower is not None and random.random() < 0.3:
+				tower['tempF'] = round(tower['tempF'] + random.choice((-0.1, 0.1)), 1)
+				tower['timestamp'] = timestamp
+				by_id = self.payload.get('towers', {}).get('{:08d}'.format(n))
+				if by_id is not None:
+					by_id['tempF'] = tower['tempF']
+					by_id['timestamp'] = timestamp
+		if 'moon' in self.payload:
+			self.payload['moon']['timestamp'] = timestamp
+
+	def etag(self, sections, units=None):
+		key = '{}|{}|{}'.format(self.payload['current']['timestamp'], ','.join(sections), units)
+		return '"{}"'.format(hashlib.md5(key.encode()).hexdigest())
+
+
+class StandInServer:
+	"""aiohttp application serving any number of stand-in stations."""
+
+	def __init__(self, payload=None, towers=0, latency=0.0, jitter=0.0, error_rate=0.0):
+		self.payload = payload or synthetic_payload(towers)
+		self.towers = towers
+		self.latency = latency
+		self.jitter = jitter
+		self.error_rate = error_rate
+		self.stations = {}
+		self.app = web.Application()
+		self.app.router.add_get('/{station}/data', self.handle_data)
+		self._runner = None
+
+	def station(self, name):
+		if name not in self.stations:
+			self.stations[name] = Station(self.payload, self.towers)
+		return self.stations[name]
+
+	def observe(self):
+		"""Record a new observation at every station."""
+		for station in self.stations.values():
+			station.observe()
+
+	async def handle_data(self, request):
+		station = self.station(request.match_info['station'])
+		station.requests += 1
+		if self.latency or self.jitter:
+			await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+		if random.random() < self.error_rate:
+			station.errors += 1
+			raise web.HTTPInternalServerError()
+
+		sections = DEFAULT_SECTIONS
+		if request.query.get('sections'):
+			sections = [section for section in SECTIONS if section in request.query['sections'].split(',')]
+		units = request.query.get('units')
+		if units not in ('imperial', 'metric'):
+			units = None
+		etag = station.etag(sections, units)
+		if request.headers.get('If-None-Match') == etag:
+			station.not_modified += 1
+			return web.Response(status=304, headers={'ETag': etag})
+
+		payload = {section: station.payload[section] for section in sections if section in station.payload}
+		if 'towers' in sections and 'current' in payload:
+			# the towers are only listed by sensor ID then
+			payload['current'] = {field: value for field, value in payload['current'].items()
+								  if not isinstance(value, dict)}
+		if units is not None:
+			drop = set(UNIT_FIELDS.values()) if units == 'imperial' else set(UNIT_FIELDS)
+			payload = {section: fields if section in ('moon', 'towers') else
+					   {field: value for field, value in fields.items() if field not in drop}
+					   for section, fields in payload.items()}
+		body = json.dumps(payload)
+		return web.Response(text=body, content_type='text/html', headers={'ETag': etag})
+
+	async def start(self, host='127.0.0.1', port=0):
+		"""Start serving, returns the port."""
+		self._runner = web.AppRunner(self.app)
+		await self._runner.setup()
+		site = web.TCPSite(self._runner, host, port)
+		await site.start()
+		return site._server.sockets[0].getsockname()[1]
+
+	async def stop(self):
+		if self._runner is not None:
+			await self._runner.cleanup()
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--port', type=int, default=8099)
+	parser.add_argument('--payload', help='recorded data?json payload to serve')
+	parser.add_argument('--towers', type=int, default=0)
+	parser.add_argument('--latency', type=float, default=0, help='response latency in ms')
+	parser.add_argument('--jitter', type=float, default=0, help='random extra latency in ms')
+	parser.add_argument('--errors', type=float, default=0, help='fraction of requests answered with 500')
+	parser.add_argument('--interval', type=float, default=18, help='seconds between observations')
+	args = parser.parse_args()
+
+	payload = None
+	if args.payload:
+		with open(args.payload) as payload_file:
+			payload = json.load(payload_file)
+	server = StandInServer(payload, args.towers, args.latency / 1000, args.jitter / 1000, args.errors)
+
+	async def serve():
+		port = await server.start(port=args.port)
+		print('Serving stand-in Acuparse stations on http://127.0.0.1:{}/<station>/data'.format(port))
+		while True:
+			await asyncio.sleep(args.interval)
+			server.observe()
+
+	try:
+		asyncio.get_event_loop().run_until_complete(serve())
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,189 @@
+"""
+Rolling statistics of the current conditions for the Acuparse history sensors.
+
+Every new current observation (a new current.timestamp) is added to a
+fixed size ring buffer per statistic. Minimum and maximum are kept with
+monotonic queues, mean and slope with running sums, so adding an
+observation takes constant time whatever the window.
+"""
+from array import array
+from collections import deque
+from datetime import datetime
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+EPOCH = datetime(1970, 1, 1)
+
+STATISTICS = ('min', 'max', 'mean', 'slope', 'change')
+
+
+class RollingWindow:
+	"""A statistic of the samples of the last window seconds.
+
+	slope is per hour. change is the difference between the newest sample
+	and the one a window ago, None until the samples cover the window.
+	"""
+
+	def __init__(self, window, statistic, capacity):
+		"""Initialize, capacity is the most samples kept."""
+		if statistic not in STATISTICS:
+			raise ValueError("Unknown statistic {}".format(statistic))
+		self._window = window
+		self._statistic = statistic
+		self._capacity = capacity
+		self._times = array('d', bytes(8 * capacity))
+		self._values = array('d', bytes(8 * capacity))
+		# absolute sample numbers, the ring position is number % capacity
+		self._first = 0
+		self._next = 0
+		self._max = deque()
+		self._min = deque()
+		self._origin = None
+		self._sums = [0.0] * 4
+
+	def clear(self):
+		"""Drop all samples."""
+		self._first = self._next = 0
+		self._max.clear()
+		self._min.clear()
+		self._origin = None
+		self._sums = [0.0] * 4
+
+	def _rebase(self):
+		"""Recalculate the running sums relative to the oldest sample.
+
+		Keeps the times in the sums small. It runs at most about once per
+		window, so it does not change the amortized cost.
+		"""
+		capacity = self._capacity
+		self._origin = self._times[self._first % capacity]
+		sums = [0.0] * 4
+		for number in range(self._first, self._next):
+			time = self._times[number % capacity] - self._origin
+			value = self._values[number % capacity]
+			sums[0] += time
+			sums[1] += value
+			sums[2] += time * time
+			sums[3] += time * value
+		self._sums = sums
+
+	def _drop_oldest(self):
+		number = self._first
+		position = number % self._capacity
+		if self._max and self._max[0] == number:
+			self._max.popleft()
+		if self._min and self._min[0] == number:
+			self._min.popleft()
+		time = self._times[position] - self._origin
+		value = self._values[position]
+		sums = self._sums
+		sums[0] -= time
+		sums[1] -= value
+		sums[2] -= time * time
+		sums[3] -= time * value
+		self._first += 1
+
+	def add(self, time, value):
+		"""Add a sample, time in seconds and later than the previous one."""
+		while self._next > self._first and (
+				self._next - self._first >= self._capacity
+				or self._times[self._first % self._capacity] <= time - self._window):
+			self._drop_oldest()
+		if self._next == self._first:
+			self._origin = time
+			self._sums = [0.0] * 4
+
+		number = self._next
+		position = number % self._capacity
+		self._times[position] = time
+		self._values[position] = value
+		self._next += 1
+		while self._max and self._values[self._max[-1] % self._capacity] <= value:
+			self._max.pop()
+		self._max.append(number)
+		while self._min and self._values[self._min[-1] % self._capacity] >= value:
+			self._min.pop()
+		self._min.append(number)
+
+		if time - self._origin > 2 * self._window:
+			self._rebase()
+		else:
+			offset = time - self._origin
+			sums = self._sums
+			sums[0] += offset
+			sums[1] += value
+			sums[2] += offset * offset
+			sums[3] += offset * value
+
+	def value(self):
+		"""Return the statistic, None without enough samples."""
+		count = self._next - self._first
+		if not count:
+			return None
+		capacity = self._capacity
+		statistic = self._statistic
+		if statistic == 'max':
+			return self._values[self._max[0] % capacity]
+		if statistic == 'min':
+			return self._values[self._min[0] % capacity]
+		if statistic == 'mean':
+			return round(self._sums[1] / count, 2)
+		if count < 2:
+			return None
+		if statistic == 'change':
+			oldest = self._times[self._first % capacity]
+			newest = self._times[(self._next - 1) % capacity]
+			if newest - oldest < 0.9 * self._window:
+				return None
+			return round(self._values[(self._next - 1) % capacity] - self._values[self._first % capacity], 2)
+		sum_t, sum_v, sum_tt, sum_tv = self._sums
+		spread = count * sum_tt - sum_t * sum_t
+		if spread <= 0:
+			return None
+		return round((count * sum_tv - sum_t * sum_v) / spread * 3600, 2)
+
+
+class ObservationHistory:
+	"""Rolling statistics over the recent current observations."""
+
+	def __init__(self, capacity):
+		"""Initialize, capacity is the most observations kept per statistic."""
+		self._capacity = capacity
+		# name => (current field, window)
+		self._stats = {}
+		self._timestamp = None
+		self._time = None
+		self._values = {}
+
+	def track(self, name, field, window, statistic):
+		"""Calculate a statistic of a current field over window seconds."""
+		self._stats[name] = (field, RollingWindow(window, statistic, self._capacity))
+
+	def add(self, current):
+		"""Add a current conditions observation, returns the history section.
+
+		Observations are keyed on their timestamp, the same observation
+		added again is ignored.
+		"""
+		timestamp = current.get('timestamp')
+		if timestamp is None or timestamp == self._timestamp:
+			return self._values
+		try:
+			time = (datetime.strptime(timestamp, TIMESTAMP_FORMAT) - EPOCH).total_seconds()
+		except (TypeError, ValueError):
+			return self._values
+		if self._time is not None and time <= self._time:
+			# station clock went back (DST), start over
+			for field, window in self._stats.values():
+				window.clear()
+		self._timestamp = timestamp
+		self._time = time
+
+		values = {'timestamp': timestamp}
+		for name, (field, window) in self._stats.items():
+			try:
+				window.add(time, float(current[field]))
+			except (KeyError, TypeError, ValueError):
+				pass
+			values[name] = window.value()
+		self._values = values
+		return values
@@ -0,0 +1,223 @@
+"""
+Moon phase calculations for the Acuparse moon sensors.
+
+A port of the MoonPhase class used by Acuparse (php-moon-phase, itself
+based on John Walker's moontool) so the moon section does not need to be
+fetched from the server. moon_data() returns the same fields data.php
+sends.
+"""
+from datetime import datetime
+from math import atan, cos, degrees, floor, radians, sin, sqrt, tan
+import time
+
+# Astronomical constants, epoch 1980 January 0.0
+EPOCH = 2444238.5
+ELONGE = 278.833540     # ecliptic longitude of the Sun at epoch
+ELONGP = 282.596403     # ecliptic longitude of the Sun at perigee
+ECCENT = 0.016718       # eccentricity of Earth's orbit
+MMLONG = 64.975464      # Moon's mean longitude at the epoch
+MMLONGP = 349.383063    # mean longitude of the perigee at the epoch
+MECC = 0.054900         # eccentricity of the Moon's orbit
+MSMAX = 384401          # semi-major axis of the Moon's orbit, km
+SYNMONTH = 29.53058868  # synodic month (new Moon to new Moon)
+
+PHASE_NAMES = ('New Moon', 'Waxing Crescent', 'First Quarter', 'Waxing Gibbous',
+			   'Full Moon', 'Waning Gibbous', 'Third Quarter', 'Waning Crescent', 'New Moon')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _fixangle(angle):
+	return angle - 360.0 * floor(angle / 360.0)
+
+
+def _round(value, digits=0):
+	"""Round half away from zero, like round() in PHP."""
+	scale = 10 ** digits
+	return floor(value * scale + 0.5) / scale if digits else int(floor(value + 0.5))
+
+
+def _kepler(m, ecc):
+	"""Solve the equation of Kepler."""
+	e = m = radians(m)
+	while True:
+		delta = e - ecc * sin(e) - m
+		e -= delta / (1 - ecc * cos(e))
+		if abs(delta) <= 1e-6:
+			return e
+
+
+def _julian(timestamp):
+	return timestamp / 86400 + 2440587.5
+
+
+def _unix(julian):
+	return (julian - 2440587.5) * 86400
+
+
+def phase(timestamp):
+	"""Return (phase, illumination, age, distance) of the Moon at a unix timestamp.
+
+	phase is the fraction of the lunation (0 new, 0.5 full), age is in days
+	and distance in km.
+	"""
+	day = _julian(timestamp) - EPOCH
+
+	# Sun
+	n = _fixangle((360 / 365.2422) * day)
+	m = _fixangle(n + ELONGE - ELONGP)
+	ec = _kepler(m, ECCENT)
+	ec = sqrt((1 + ECCENT) / (1 - ECCENT)) * tan(ec / 2)
+	ec = 2 * degrees(atan(ec))
+	lambdasun = _fixangle(ec + ELONGP)
+
+	# Moon
+	ml = _fixangle(13.1763966 * day + MMLONG)
+	mm = _fixangle(ml - 0.1114041 * day - MMLONGP)
+	ev = 1.2739 * sin(radians(2 * (ml - lambdasun) - mm))
+	ae = 0.1858 * sin(radians(m))
+	a3 = 0.37 * sin(radians(m))
+	mmp = mm + ev - ae - a3
+	mec = 6.2886 * sin(radians(mmp))
+	a4 = 0.214 * sin(radians(2 * mmp))
+	lp = ml + ev + mec - ae + a4
+	v = 0.6583 * sin(radians(2 * (lp - lambdasun)))
+	lpp = lp + v
+
+	moon_age = lpp - lambdasun
+	fraction = _fixangle(moon_age) / 360
+	illumination = (1 - cos(radians(moon_age))) / 2
+	distance = (MSMAX * (1 - MECC * MECC)) / (1 + MECC * cos(radians(mmp + mec)))
+	return fraction, illumination, SYNMONTH * fraction, distance
+
+
+def _meanphase(sdate, k):
+	"""Return the time of the mean new Moon for lunation k."""
+	t = (sdate - 2415020.0) / 36525
+	t2 = t * t
+	t3 = t2 * t
+	return (2415020.75933 + SYNMONTH * k + 0.0001178 * t2 - 0.000000155 * t3
+			+ 0.00033 * sin(radians(166.56 + 132.87 * t - 0.009173 * t2)))
+
+
+def _truephase(k, quarter):
+	"""Return the true time of a phase (0, 0.25, 0.5, 0.75) of lunation k."""
+	k += quarter
+	t = k / 1236.85
+	t2 = t * t
+	t3 = t2 * t
+	pt = (2415020.75933 + SYNMONTH * k + 0.0001178 * t2 - 0.000000155 * t3
+		  + 0.00033 * sin(radians(166.56 + 132.87 * t - 0.009173 * t2)))
+	m = radians(359.2242 + 29.10535608 * k - 0.0000333 * t2 - 0.00000347 * t3)
+	mprime = radians(306.0253 + 385.81691806 * k + 0.0107306 * t2 + 0.00001236 * t3)
+	f = radians(21.2964 + 390.67050646 * k - 0.0016528 * t2 - 0.00000239 * t3)
+
+	if quarter in (0, 0.5):
+		pt += ((0.1734 - 0.000393 * t) * sin(m)
+			   + 0.0021 * sin(2 * m)
+			   - 0.4068 * sin(mprime)
+			   + 0.0161 * sin(2 * mprime)
+			   - 0.0004 * sin(3 * mprime)
+			   + 0.0104 * sin(2 * f)
+			   - 0.0051 * sin(m + mprime)
+			   - 0.0074 * sin(m - mprime)
+			   + 0.0004 * sin(2 * f + m)
+			   - 0.0004 * sin(2 * f - m)
+			   - 0.0006 * sin(2 * f + mprime)
+			   + 0.0010 * sin(2 * f - mprime)
+			   + 0.0005 * sin(m + 2 * mprime))
+	else:
+		pt += ((0.1721 - 0.0004 * t) * sin(m)
+			   + 0.0021 * sin(2 * m)
+			   - 0.6280 * sin(mprime)
+			   + 0.0089 * sin(2 * mprime)
+			   - 0.0004 * sin(3 * mprime)
+			   + 0.0079 * sin(2 * f)
+			   - 0.0119 * sin(m + mprime)
+			   - 0.0047 * sin(m - mprime)
+			   + 0.0003 * sin(2 * f + m)
+			   - 0.0004 * sin(2 * f - m)
+			   - 0.0006 * sin(2 * f + mprime)
+			   + 0.0021 * sin(2 * f - mprime)
+			   + 0.0003 * sin(m + 2 * mprime)
+			   + 0.0004 * sin(m - 2 * mprime)
+			   - 0.0003 * sin(2 * m + mprime))
+		if quarter < 0.5:
+			pt += 0.0028 - 0.0004 * cos(m) + 0.0003 * cos(mprime)
+		else:
+			pt += -0.0028 + 0.0004 * cos(m) - 0.0003 * cos(mprime)
+	return pt
+
+
+def phasehunt(timestamp):
+	"""Return the unix times of the phases of the lunation around a unix timestamp.
+
+	The eight times are the new Moon, first quarter, full Moon and last
+	quarter of the current lunation followed by those of the next one.
+	"""
+	sdate = _julian(timestamp)
+	adate = sdate - 45
+	start = time.gmtime(timestamp - 86400 * 45)
+	k1 = floor((start.tm_year + ((start.tm_mon - 1) * (1 / 12)) - 1900) * 12.3685)
+	adate = nt1 = _meanphase(adate, k1)
+	while True:
+		adate += SYNMONTH
+		k2 = k1 + 1
+		nt2 = _meanphase(adate, k2)
+		if abs(nt2 - sdate) < 0.75:
+			nt2 = _truephase(k2, 0.0)
+		if nt1 <= sdate < nt2:
+			break
+		nt1 = nt2
+		k1 = k2
+	return tuple(_unix(_truephase(k, quarter))
+				 for k in (k1, k2) for quarter in (0.0, 0.25, 0.5, 0.75))
+
+
+class MoonCalculator:
+	"""Moon section values, memoized per minute.
+
+	The phase times only change once per lunation, so they are kept until
+	the next new Moon.
+	"""
+
+	def __init__(self, to_local=datetime.fromtimestamp):
+		"""Initialize, to_local converts a unix timestamp to a local datetime."""
+		self._to_local = to_local
+		self._minute = None
+		self._data = None
+		self._quarters = None
+
+	def _format(self, timestamp):
+		"""Format a unix time like date('j M @ H:i') in PHP."""
+		local = self._to_local(timestamp)
+		return '{} {} @ {:02d}:{:02d}'.format(local.day, MONTHS[local.month - 1], local.hour, local.minute)
+
+	def moon_data(self, timestamp=None):
+		"""Return the moon section for a unix timestamp (default now)."""
+		if timestamp is None:
+			timestamp = time.time()
+		minute = int(timestamp // 60)
+		if minute == self._minute:
+			return self._data
+
+		timestamp = minute * 60
+		if (self._quarters is None
+				or not self._quarters[0] <= timestamp < self._quarters[4]):
+			self._quarters = phasehunt(timestamp)
+		quarters = self._quarters
+
+		fraction, illumination, age, distance = phase(timestamp)
+		self._minute = minute
+		self._data = {
+			'age': _round(age, 1),
+			'stage': PHASE_NAMES[int(floor((fraction + 0.0625) * 8))],
+			'next_new': self._format(quarters[4]),
+			'next_full': self._format(quarters[6]),
+			'last_new': self._format(quarters[0]),
+			'last_full': self._format(quarters[2]),
+			'distance': _round(distance),
+			'illumination': _round(illumination * 100),
+			'icon_url': '/local/moon/{}.gif'.format(_round(age)),
+			'timestamp': self._to_local(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+		}
+		return self._data
@@ -4,9 +4,13 @@ Support for Acuparse weather service.
 beta version based on wunderground component from Home Assistant.
 """
 import asyncio
+from collections.abc import Mapping
 from datetime import timedelta
+import json
 import logging
+import random
 import re
+import time
 
 import aiohttp
 import async_timeout
@@ -15,377 +19,555 @@ import voluptuous as vol
 from homeassistant.helpers.typing import HomeAssistantType, ConfigType
 from homeassistant.components import sensor
 from homeassistant.components.sensor import PLATFORM_SCHEMA
-from homeassistant.const import (CONF_MONITORED_CONDITIONS, TEMP_FAHRENHEIT, TEMP_CELSIUS, LENGTH_INCHES, ATTR_ATTRIBUTION)
+from homeassistant.const import (CONF_MONITORED_CONDITIONS, CONF_NAME, CONF_TIMEOUT, EVENT_HOMEASSISTANT_STOP, TEMP_FAHRENHEIT, TEMP_CELSIUS, LENGTH_INCHES, ATTR_ATTRIBUTION)
 from homeassistant.exceptions import PlatformNotReady
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.util import Throttle
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
 import homeassistant.helpers.config_validation as cv
+from homeassistant.util import slugify
+import homeassistant.util.dt as dt_util
 
-_RESOURCE = 'http://{}/data?json'
+from .history import ObservationHistory
+from .moon import MoonCalculator
+
+try:
+	from orjson import loads as json_loads
+except ImportError:
+	json_loads = json.loads
+
+_RESOURCE = 'http://{}/data?json&sections={}'
+_STREAM_RESOURCE = 'http://{}/stream'
 _LOGGER = logging.getLogger(__name__)
 
 CONF_ATTRIBUTION = "Data provided by Acuparse"
 CONF_HOSTNAME = 'hostname'
 CONF_DEBUG = 'debug'
 CONF_REFRESH_SECONDS = 'refresh_seconds'
+CONF_ADAPTIVE = 'adaptive'
+CONF_STATIONS = 'stations'
+CONF_MAX_CONCURRENT = 'max_concurrent'
+CONF_MAX_STALENESS = 'max_staleness'
+CONF_PUSH = 'push'
+CONF_DIAGNOSTICS = 'diagnostics'
+CONF_TOWERS = 'towers'
+CONF_UNITS = 'units'
+
+DATA_ACUPARSE = 'acuparse'
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_CONCURRENT = 4
+
+ATTR_SNAPSHOT_AGE = 'snapshot_age'
+
+# Last good data of each station, restored at startup
+STORAGE_KEY = 'acuparse.{}'
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+# Ask for the fields changed since the last version, with a full fetch at least this often
+FULL_RESYNC = timedelta(minutes=15)
+
+# How often each section is requested, and whether it is requested early
+# when the current conditions beat one of its highs or lows. The historical
+# sections are also requested again as soon as the day rolls over.
+SECTION_REFRESH = {
+	'current': (timedelta(0), False),
+	'towers': (timedelta(0), False),
+	'yesterday': (timedelta(hours=6), False),
+	'this_week': (timedelta(minutes=5), True),
+	'this_month': (timedelta(minutes=15), True),
+	'last_month': (timedelta(hours=6), False),
+	'this_year': (timedelta(hours=1), True),
+	'all_time': (timedelta(hours=1), True),
+}
+# Most sets of sections whose ETag and version are kept
+VALIDATOR_SETS = 8
+# Soonest a section is requested again after a new high or low
+RECORD_REFRESH = timedelta(minutes=1)
+# Current field => the high and low fields of the historical sections it can beat, as in data.php
+RECORD_FIELDS = {
+	'tempF': ('tempF_high', 'tempF_low'),
+	'windSmph': ('windS_mph_high', None),
+	'pressure_inHg': ('pressure_inHg_high', 'pressure_inHg_low'),
+	'relH': ('relH_high', 'relH_low'),
+	'rainIN': ('rainfall_IN_most', None),
+}
+
+# Current conditions stream (push mode), the server sends a keepalive every 15s
+STREAM_READ_TIMEOUT = timedelta(seconds=60)
+STREAM_MAX_RETRY = timedelta(minutes=5)
+
+# Sections calculated by the component instead of fetched from Acuparse
+LOCAL_SECTIONS = {'moon', 'history'}
+MOON_REFRESH = timedelta(minutes=1)
+
+# Rolling statistics of the current conditions received (the history
+# section): field => (current field, window, statistic, see history.py)
+HISTORY_STATS = {
+	'windSmph_max10': ('windSmph', timedelta(minutes=10), 'max'),
+	'windSkmh_max10': ('windSkmh', timedelta(minutes=10), 'max'),
+	'rainIN_mean60': ('rainIN', timedelta(hours=1), 'mean'),
+	'rainMM_mean60': ('rainMM', timedelta(hours=1), 'mean'),
+	'pressure_inHg_change180': ('pressure_inHg', timedelta(hours=3), 'change'),
+	'pressure_kPa_change180': ('pressure_kPa', timedelta(hours=3), 'change'),
+	'tempF_slope60': ('tempF', timedelta(hours=1), 'slope'),
+	'tempF_max60': ('tempF', timedelta(hours=1), 'max'),
+	'tempF_min60': ('tempF', timedelta(hours=1), 'min'),
+}
+# Most observations kept per statistic, 3 hours of 16 second observations
+HISTORY_CAPACITY = 720
 
-MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=60)
+# Unit conversions, to fill in the fields left out of single unit system
+# payloads (CONF_UNITS): (imperial field, metric field, to metric, to imperial)
+UNITS_IMPERIAL = 'imperial'
+UNITS_METRIC = 'metric'
+_TEMPERATURE = (lambda f: round((f - 32) * 5 / 9, 1), lambda c: round(c * 9 / 5 + 32, 1))
+_PRESSURE = (lambda inhg: round(inhg * 3.386389, 2), lambda kpa: round(kpa / 3.386389, 2))
+_SPEED = (lambda mph: round(mph * 1.609344, 1), lambda kmh: round(kmh / 1.609344, 1))
+_RAIN = (lambda inches: round(inches * 25.4, 1), lambda mm: round(mm / 25.4, 2))
+UNIT_CONVERSIONS = [
+	('tempF', 'tempC') + _TEMPERATURE,
+	('feelsF', 'feelsC') + _TEMPERATURE,
+	('dewptF', 'dewptC') + _TEMPERATURE,
+	('tempF_high', 'tempC_high') + _TEMPERATURE,
+	('tempF_low', 'tempC_low') + _TEMPERATURE,
+	('tempF_avg', 'tempC_avg') + _TEMPERATURE,
+	('pressure_inHg', 'pressure_kPa') + _PRESSURE,
+	('pressure_inHg_high', 'pressure_kPa_high') + _PRESSURE,
+	('pressure_inHg_low', 'pressure_kPa_low') + _PRESSURE,
+	('windSmph', 'windSkmh') + _SPEED,
+	('windSmph_avg2', 'windSkmh_avg2') + _SPEED,
+	('windSmph_avg10', 'windSkmh_avg10') + _SPEED,
+	('windSmph_peak', 'windSkmh_peak') + _SPEED,
+	('windSmph_max5', 'windSkmh_max5') + _SPEED,
+	('windS_mph_high', 'windS_kmh_high') + _SPEED,
+	('rainIN', 'rainMM') + _RAIN,
+	('rainTotalIN_today', 'rainTotalMM_today') + _RAIN,
+	('rainfall_IN_most', 'rainfall_MM_most') + _RAIN,
+	('rainfall_IN_total', 'rainfall_MM_total') + _RAIN,
+]
+
+# Towers are discovered from the towers section, each tower's reading is
+# split into its own section for the tower sensors
+TOWERS = 'towers'
+TOWER_SECTION = 'tower.{}'
+# kind => friendly name, field, icon, unit
+TOWER_SENSOR_TYPES = {
+	'temp': ('Temp', 'tempF', 'mdi:thermometer', TEMP_FAHRENHEIT),
+	'relh': ('Relative Humidity', 'relH', 'mdi:water', '%'),
+	'last_seen': ('Last Seen', 'timestamp', 'mdi:clock-outline', None),
+}
+
+# Polling schedule (see AcuparseData._next_delay)
+MIN_REFRESH = timedelta(seconds=5)
+MAX_BACKOFF = timedelta(minutes=10)
+SLOW_RESPONSE = timedelta(seconds=5)
+OBSERVATION_MARGIN = timedelta(seconds=2)
+OBSERVATION_GAP = timedelta(minutes=5)
+POLL_JITTER = timedelta(seconds=2)
 
 # Helper classes for declaring sensor configurations
 
+# Added to the friendly names of the sensors of the historical sections
+SECTION_SUFFIXES = {
+	'yesterday': " Yesterday",
+	'this_week': " This Week",
+	'this_month': " This Month",
+	'last_month': " Last Month",
+	'this_year': " This Year",
+	'all_time': " All Time",
+}
+
+
 class SensorConfig:
 	"""Acuparse Sensor Configuration.
 
 	defines basic HA properties of the weather sensor and
-	stores callbacks that can parse sensor values out of
-	the json data received from Acuparse.
+	where its value is found in the json data received from Acuparse.
 	"""
 
-	def __init__(self, section, friendly_name, feature, value,
+	__slots__ = ('section', 'friendly_name', 'unit_of_measurement', 'field', 'icon',
+				 'device_state_attributes', 'entity_picture', 'timestamp')
+
+	def __init__(self, section, friendly_name, field,
 				 unit_of_measurement=None, entity_picture=None,
-				 icon="mdi:gauge", device_state_attributes=None):
+				 icon="mdi:gauge", device_state_attributes=None, timestamp=None):
 		"""Constructor.
 
 		Args:
-			friendly_name (string|func): Friendly name
-			feature (string): Acuparse item
-			value callback that extracts desired value from AcuparseData object
+			section (string): Acuparse data section the value is read from
+			friendly_name (string): Friendly name
+			field (string): Field name in the section
 			unit_of_measurement (string): unit of measurement
-			entity_picture (string): value or callback returning URL of entity picture
+			entity_picture (string): field in the section holding the URL of the entity picture
 			icon (string): icon name or URL
-			device_state_attributes (dict): dictionary of attributes,
-				or callable that returns it
+			device_state_attributes (dict): attribute name to field in the section
+			timestamp (string): field in the section holding the observation time,
+				reported as the date attribute when the value changes
 		"""
-		if section == 'yesterday':
-			friendly_name = friendly_name + " Yesterday"
-		elif section == 'this_week':
-			friendly_name = friendly_name + " This Week"
-		elif section == 'this_month':
-			friendly_name = friendly_name + " This Month"
-		elif section == 'last_month':
-			friendly_name = friendly_name + " Last Month"
-		elif section == 'this_year':
-			friendly_name = friendly_name + " This Year"
-		elif section == 'all_time':
-			friendly_name = friendly_name + " All Time"
-		
-		self.friendly_name = friendly_name
+		self.section = section
+		self.friendly_name = friendly_name + SECTION_SUFFIXES.get(section, "")
 		self.unit_of_measurement = unit_of_measurement
-		self.feature = feature
-		self.value = value
+		self.field = field
 		self.icon = icon
 		self.device_state_attributes = device_state_attributes or {}
 		self.entity_picture = entity_picture
+		self.timestamp = timestamp
 
 
 class AcuparseConditionsSensorConfig(SensorConfig):
 	"""Helper for defining sensor configurations for current conditions."""
 
+	__slots__ = ()
+
 	def __init__(self, section, friendly_name, field, icon="mdi:gauge", unit_of_measurement=None):
 		"""Constructor.
 
 		Args:
-			friendly_name (string|func): Friendly name of sensor
-			field (string): Field name in the "current_observation" dictionary.
-			icon (string): icon name or URL, if None sensor will use current weather symbol
+			friendly_name (string): Friendly name of sensor
+			field (string): Field name in the section.
+			icon (string): icon name or URL, if None sensor will use the section's icon_url
 			unit_of_measurement (string): unit of measurement
 		"""
 		
 		super().__init__(
 			section,
 			friendly_name,
-			"conditions",
-			value=lambda wu: wu.data[section][field],
+			field,
 			icon=icon,
 			unit_of_measurement=unit_of_measurement,
-			entity_picture=lambda wu: wu.data[section]['icon_url'] if icon is None else None,
-			device_state_attributes={'date': lambda wu: wu.data[section]['timestamp'] }
+			entity_picture='icon_url' if icon is None else None,
+			timestamp='timestamp'
 		)
 
 
-# Declaration of supported Acuparse sensors
-# Declaration of supported Acuparse sensors
-# (see above helper classes for argument explanation)
-
-SENSOR_TYPES = {
-	'temp':                AcuparseConditionsSensorConfig('current', 'Temp',                  'tempF',              'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'temp_trend':          AcuparseConditionsSensorConfig('current', 'Temp',                  'tempF_trend',        'mdi:thermometer',   'trend'),
-	'feels':               AcuparseConditionsSensorConfig('current', 'Temp Feels Like',       'feelsF',             'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'dewpt':               AcuparseConditionsSensorConfig('current', 'Dewpoint',              'dewptF',             'mdi:water',         TEMP_FAHRENHEIT),
-	'temp_high':           AcuparseConditionsSensorConfig('current', 'Temp High ',            'tempF_high',         'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'temp_high_time':      AcuparseConditionsSensorConfig('current', 'Temp High Time',        'high_temp_recorded', 'mdi:thermometer',   'time'),
-	'temp_low':            AcuparseConditionsSensorConfig('current', 'Temp Low',              'tempF_low',          'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'temp_low_time':       AcuparseConditionsSensorConfig('current', 'Temp Low Time',         'low_temp_recorded',  'mdi:thermometer',   'time'),
-	'temp_avg':            AcuparseConditionsSensorConfig('current', 'Temp Average',          'tempF_avg',          'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'relh':                AcuparseConditionsSensorConfig('current', 'Relative Humidity',     'relH',               'mdi:water',         '%'),
-	'relh_trend':          AcuparseConditionsSensorConfig('current', 'Relative Humidity',     'relH_trend',         'mdi:water',         'trend'),
-	'pressure_inhg':       AcuparseConditionsSensorConfig('current', 'Pressure',              'pressure_inHg',      'mdi:gauge',         'inHg'),
-	'pressure_kpa':        AcuparseConditionsSensorConfig('current', 'Pressure',              'pressure_kPa',       'mdi:gauge',         'kPa'),
-	'pressure_trend':      AcuparseConditionsSensorConfig('current', 'Pressure',              'inHg_trend',         'mdi:gauge',         'trend'),
-	'wind_mph':            AcuparseConditionsSensorConfig('current', 'Wind',                  'windSmph',           'mdi:weather-windy', 'mph'),
-	'wind_kmh':            AcuparseConditionsSensorConfig('current', 'Wind',                  'windSkmh',           'mdi:weather-windy', 'kph'),
-	'wind_dir':            AcuparseConditionsSensorConfig('current', 'Wind',                  'windDIR',            'mdi:weather-windy', 'direction'),
-	'wind_deg':            AcuparseConditionsSensorConfig('current', 'Wind',                  'windDEG',            'mdi:weather-windy', 'degrees'),
-	'wind_deg_avg2':       AcuparseConditionsSensorConfig('current', 'Wind Avg 2',            'windDEG_avg2',       'mdi:weather-windy', 'degrees'),
-	'wind_dir_avg2':       AcuparseConditionsSensorConfig('current', 'Wind Avg 2',            'windDIR_avg2',       'mdi:weather-windy', 'direction'),
-	'wind_mph_avg2':       AcuparseConditionsSensorConfig('current', 'Wind Avg 2',            'windSmph_avg2',      'mdi:weather-windy', 'mph'),
-	'wind_kmh_avg2':       AcuparseConditionsSensorConfig('current', 'Wind Avg 2',            'windSkmh_avg2',      'mdi:weather-windy', 'kph'),
-	'wind_deg_avg10':      AcuparseConditionsSensorConfig('current', 'Wind Avg 10',           'windDEG_avg10',      'mdi:weather-windy', 'degrees'),
-	'wind_mph_avg10':      AcuparseConditionsSensorConfig('current', 'Wind Avg 10',           'windSmph_avg10',     'mdi:weather-windy', 'mph'),
-	'wind_kmh_avg10':      AcuparseConditionsSensorConfig('current', 'Wind Avg 10',           'windSkmh_avg10',     'mdi:weather-windy', 'kph'),
-	'wind_deg_peak':       AcuparseConditionsSensorConfig('current', 'Wind Max',              'windDEG_peak',       'mdi:weather-windy', 'degrees'),
-	'wind_dir_peak':       AcuparseConditionsSensorConfig('current', 'Wind Max',              'windDIR_peak',       'mdi:weather-windy', 'direction'),
-	'wind_peak_time':      AcuparseConditionsSensorConfig('current', 'Wind Max',              'wind_recorded_peak', 'mdi:weather-windy', 'time'),
-	'wind_mph_peak':       AcuparseConditionsSensorConfig('current', 'Wind Max',              'windSmph_peak',      'mdi:weather-windy', 'mph'),
-	'wind_kmh_peak':       AcuparseConditionsSensorConfig('current', 'Wind Max',              'windSkmh_peak',      'mdi:weather-windy', 'kph'),
-	'wind_mph_max5':       AcuparseConditionsSensorConfig('current', 'Wind Max 5',            'windSmph_max5',      'mdi:weather-windy', 'mph'),
-	'wind_kmh_max5':       AcuparseConditionsSensorConfig('current', 'Wind Max 5',            'windSkmh_max5',      'mdi:weather-windy', 'kph'),
-	'rain_rate_in':        AcuparseConditionsSensorConfig('current', 'Rain Rate',             'rainIN',             'mdi:umbrella',      'in/hr'),
-	'rain_rate_mm':        AcuparseConditionsSensorConfig('current', 'Rain Rate',             'rainMM',             'mdi:umbrella',      'mm/hr'),
-	'rain_total_in_today': AcuparseConditionsSensorConfig('current', 'Rain Total',            'rainTotalIN_today',  'mdi:umbrella',      LENGTH_INCHES),
-	'rain_total_mm_today': AcuparseConditionsSensorConfig('current', 'Rain Total',            'rainTotalMM_today',  'mdi:umbrella',      'mm'),
-	
-	'y_temp_max':          AcuparseConditionsSensorConfig('yesterday', 'Temp High',          'tempF_high',                  'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'y_temp_min':          AcuparseConditionsSensorConfig('yesterday', 'Temp Low',           'tempF_low',                   'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'y_temp_max_when':     AcuparseConditionsSensorConfig('yesterday', 'Temp High',          'tempF_high_recorded',         'mdi:thermometer',   'time'),
-	'y_temp_min_when':     AcuparseConditionsSensorConfig('yesterday', 'Temp Low',           'tempF_low_recorded',          'mdi:thermometer',   'time'),
-	'y_wind_max_mph':      AcuparseConditionsSensorConfig('yesterday', 'Wind Max',           'windS_mph_high',              'mdi:weather-windy', 'mph'),
-	'y_wind_max_kmh':      AcuparseConditionsSensorConfig('yesterday', 'Wind Max',           'windS_kmh_high',              'mdi:weather-windy', 'kph'),
-	'y_wind_max_dir':      AcuparseConditionsSensorConfig('yesterday', 'Wind Max',           'windDIR',                     'mdi:weather-windy', 'direction'),
-	'y_wind_max_when':     AcuparseConditionsSensorConfig('yesterday', 'Wind Max',           'windS_mph_high_recorded',     'mdi:weather-windy', 'time'),
-	'y_pressure_max_inhg': AcuparseConditionsSensorConfig('yesterday', 'Pressure High',      'pressure_inHg_high',          'mdi:gauge',         'inHg'),
-	'y_pressure_min_inhg': AcuparseConditionsSensorConfig('yesterday', 'Pressure Low',       'pressure_inHg_low',           'mdi:gauge',         'inHg'),
-	'y_pressure_max_kpa':  AcuparseConditionsSensorConfig('yesterday', 'Pressure High',      'pressure_kPa_high',           'mdi:gauge',         'kPa'),
-	'y_pressure_min_kpa':  AcuparseConditionsSensorConfig('yesterday', 'Pressure Low',       'pressure_kPa_low',            'mdi:gauge',         'kPa'),
-	'y_pressure_max_when': AcuparseConditionsSensorConfig('yesterday', 'Pressure High',      'pressure_inHg_high_recorded', 'mdi:gauge',         'time'),
-	'y_pressure_min_when': AcuparseConditionsSensorConfig('yesterday', 'Pressure Low',       'pressure_inHg_low_recorded',  'mdi:gauge',         'time'),
-	'y_relh_max':          AcuparseConditionsSensorConfig('yesterday', 'Humidity High',      'relH_high',                   'mdi:water',         '%'),
-	'y_relh_min':          AcuparseConditionsSensorConfig('yesterday', 'Humidity Low',       'relH_low',                    'mdi:water',         '%'),
-	'y_relh_max_when':     AcuparseConditionsSensorConfig('yesterday', 'Humidity High',      'relH_high_recorded',          'mdi:water',         'time'),
-	'y_relh_min_when':     AcuparseConditionsSensorConfig('yesterday', 'Humidity Low',       'relH_low_recorded',           'mdi:water',         'time'),
-	'y_rain_in_total':     AcuparseConditionsSensorConfig('yesterday', 'Rain Total',         'rainfall_IN_total',           'mdi:umbrella',      LENGTH_INCHES),
-	'y_rain_mm_total':     AcuparseConditionsSensorConfig('yesterday', 'Rain Total',         'rainfall_MM_total',           'mdi:umbrella',      'mm'),
-
-	'tw_temp_max':           AcuparseConditionsSensorConfig('this_week', 'Temp High',          'tempF_high',                  'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'tw_temp_min':           AcuparseConditionsSensorConfig('this_week', 'Temp Low',           'tempF_low',                   'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'tw_temp_max_when':      AcuparseConditionsSensorConfig('this_week', 'Temp High',          'tempF_high_recorded',         'mdi:thermometer',   'time'),
-	'tw_temp_min_when':      AcuparseConditionsSensorConfig('this_week', 'Temp Low',           'tempF_low_recorded',          'mdi:thermometer',   'time'),
-	'tw_wind_max_mph':       AcuparseConditionsSensorConfig('this_week', 'Wind Max',           'windS_mph_high',              'mdi:weather-windy', 'mph'),
-	'tw_wind_max_kmh':       AcuparseConditionsSensorConfig('this_week', 'Wind Max',           'windS_kmh_high',              'mdi:weather-windy', 'kph'),
-	'tw_wind_max_dir':       AcuparseConditionsSensorConfig('this_week', 'Wind Max',           'windDIR',                     'mdi:weather-windy', 'direction'),
-	'tw_wind_max_when':      AcuparseConditionsSensorConfig('this_week', 'Wind Max',           'windS_mph_high_recorded',     'mdi:weather-windy', 'time'),
-	'tw_pressure_max_inhg':  AcuparseConditionsSensorConfig('this_week', 'Pressure High',      'pressure_inHg_high',          'mdi:gauge',         'inHg'),
-	'tw_pressure_min_inhg':  AcuparseConditionsSensorConfig('this_week', 'Pressure Low',       'pressure_inHg_low',           'mdi:gauge',         'inHg'),
-	'tw_pressure_max_kpa':   AcuparseConditionsSensorConfig('this_week', 'Pressure High',      'pressure_kPa_high',           'mdi:gauge',         'kPa'),
-	'tw_pressure_min_kpa':   AcuparseConditionsSensorConfig('this_week', 'Pressure Low',       'pressure_kPa_low',            'mdi:gauge',         'kPa'),
-	'tw_pressure_max_when':  AcuparseConditionsSensorConfig('this_week', 'Pressure High',      'pressure_inHg_high_recorded', 'mdi:gauge',         'time'),
-	'tw_pressure_min_when':  AcuparseConditionsSensorConfig('this_week', 'Pressure Low',       'pressure_inHg_low_recorded',  'mdi:gauge',         'time'),
-	'tw_relh_max':           AcuparseConditionsSensorConfig('this_week', 'Humidity High',      'relH_high',                   'mdi:water',         '%'),
-	'tw_relh_min':           AcuparseConditionsSensorConfig('this_week', 'Humidity Low',       'relH_low',                    'mdi:water',         '%'),
-	'tw_relh_max_when':      AcuparseConditionsSensorConfig('this_week', 'Humidity High',      'relH_high_recorded',          'mdi:water',         'time'),
-	'tw_relh_min_when':      AcuparseConditionsSensorConfig('this_week', 'Humidity Low',       'relH_low_recorded',           'mdi:water',         'time'),
-	'tw_rain_rate_in_max':   AcuparseConditionsSensorConfig('this_week', 'Rain Rate Max',      'rainfall_IN_most',            'mdi:umbrella',      'in/hr'),
-	'tw_rain_rate_mm_max':   AcuparseConditionsSensorConfig('this_week', 'Rain Rate Max',      'rainfall_MM_most',            'mdi:umbrella',      'mm/hr'),
-	'tw_rain_rate_max_when': AcuparseConditionsSensorConfig('this_week', 'Rain Rate Max',      'rainfall_IN_most_recorded',   'mdi:umbrella',      'time'),
-	'tw_rain_in_total':      AcuparseConditionsSensorConfig('this_week', 'Rain Total',         'rainfall_IN_total',           'mdi:umbrella',      LENGTH_INCHES),
-	'tw_rain_mm_total':      AcuparseConditionsSensorConfig('this_week', 'Rain Total',         'rainfall_MM_total',           'mdi:umbrella',      'mm'),
-
-	'tm_temp_max':           AcuparseConditionsSensorConfig('this_month', 'Temp High',          'tempF_high',                  'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'tm_temp_min':           AcuparseConditionsSensorConfig('this_month', 'Temp Low',           'tempF_low',                   'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'tm_temp_max_when':      AcuparseConditionsSensorConfig('this_month', 'Temp High',          'tempF_high_recorded',         'mdi:thermometer',   'time'),
-	'tm_temp_min_when':      AcuparseConditionsSensorConfig('this_month', 'Temp Low',           'tempF_low_recorded',          'mdi:thermometer',   'time'),
-	'tm_wind_max_mph':       AcuparseConditionsSensorConfig('this_month', 'Wind Max',           'windS_mph_high',              'mdi:weather-windy', 'mph'),
-	'tm_wind_max_kmh':       AcuparseConditionsSensorConfig('this_month', 'Wind Max',           'windS_kmh_high',              'mdi:weather-windy', 'kph'),
-	'tm_wind_max_dir':       AcuparseConditionsSensorConfig('this_month', 'Wind Max',           'windDIR',                     'mdi:weather-windy', 'direction'),
-	'tm_wind_max_when':      AcuparseConditionsSensorConfig('this_month', 'Wind Max',           'windS_mph_high_recorded',     'mdi:weather-windy', 'time'),
-	'tm_pressure_max_inhg':  AcuparseConditionsSensorConfig('this_month', 'Pressure High',      'pressure_inHg_high',          'mdi:gauge',         'inHg'),
-	'tm_pressure_min_inhg':  AcuparseConditionsSensorConfig('this_month', 'Pressure Low',       'pressure_inHg_low',           'mdi:gauge',         'inHg'),
-	'tm_pressure_max_kpa':   AcuparseConditionsSensorConfig('this_month', 'Pressure High',      'pressure_kPa_high',           'mdi:gauge',         'kPa'),
-	'tm_pressure_min_kpa':   AcuparseConditionsSensorConfig('this_month', 'Pressure Low',       'pressure_kPa_low',            'mdi:gauge',         'kPa'),
-	'tm_pressure_max_when':  AcuparseConditionsSensorConfig('this_month', 'Pressure High',      'pressure_inHg_high_recorded', 'mdi:gauge',         'time'),
-	'tm_pressure_min_when':  AcuparseConditionsSensorConfig('this_month', 'Pressure Low',       'pressure_inHg_low_recorded',  'mdi:gauge',         'time'),
-	'tm_relh_max':           AcuparseConditionsSensorConfig('this_month', 'Humidity High',      'relH_high',                   'mdi:water',         '%'),
-	'tm_relh_min':           AcuparseConditionsSensorConfig('this_month', 'Humidity Low',       'relH_low',                    'mdi:water',         '%'),
-	'tm_relh_max_when':      AcuparseConditionsSensorConfig('this_month', 'Humidity High',      'relH_high_recorded',          'mdi:water',         'time'),
-	'tm_relh_min_when':      AcuparseConditionsSensorConfig('this_month', 'Humidity Low',       'relH_low_recorded',           'mdi:water',         'time'),
-	'tm_rain_rate_in_max':   AcuparseConditionsSensorConfig('this_month', 'Rain Rate Max',      'rainfall_IN_most',            'mdi:umbrella',      'in/hr'),
-	'tm_rain_rate_mm_max':   AcuparseConditionsSensorConfig('this_month', 'Rain Rate Max',      'rainfall_MM_most',            'mdi:umbrella',      'mm/hr'),
-	'tm_rain_rate_max_when': AcuparseConditionsSensorConfig('this_month', 'Rain Rate Max',      'rainfall_IN_most_recorded',   'mdi:umbrella',      'time'),
-	'tm_rain_in_total':      AcuparseConditionsSensorConfig('this_month', 'Rain Total',         'rainfall_IN_total',           'mdi:umbrella',      LENGTH_INCHES),
-	'tm_rain_mm_total':      AcuparseConditionsSensorConfig('this_month', 'Rain Total',         'rainfall_MM_total',           'mdi:umbrella',      'mm'),
-
-	'lm_temp_max':           AcuparseConditionsSensorConfig('last_month', 'Temp High',          'tempF_high',                  'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'lm_temp_min':           AcuparseConditionsSensorConfig('last_month', 'Temp Low',           'tempF_low',                   'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'lm_temp_max_when':      AcuparseConditionsSensorConfig('last_month', 'Temp High',          'tempF_high_recorded',         'mdi:thermometer',   'time'),
-	'lm_temp_min_when':      AcuparseConditionsSensorConfig('last_month', 'Temp Low',           'tempF_low_recorded',          'mdi:thermometer',   'time'),
-	'lm_wind_max_mph':       AcuparseConditionsSensorConfig('last_month', 'Wind Max',           'windS_mph_high',              'mdi:weather-windy', 'mph'),
-	'lm_wind_max_kmh':       AcuparseConditionsSensorConfig('last_month', 'Wind Max',           'windS_kmh_high',              'mdi:weather-windy', 'kph'),
-	'lm_wind_max_dir':       AcuparseConditionsSensorConfig('last_month', 'Wind Max',           'windDIR',                     'mdi:weather-windy', 'direction'),
-	'lm_wind_max_when':      AcuparseConditionsSensorConfig('last_month', 'Wind Max',           'windS_mph_high_recorded',     'mdi:weather-windy', 'time'),
-	'lm_pressure_max_inhg':  AcuparseConditionsSensorConfig('last_month', 'Pressure High',      'pressure_inHg_high',          'mdi:gauge',         'inHg'),
-	'lm_pressure_min_inhg':  AcuparseConditionsSensorConfig('last_month', 'Pressure Low',       'pressure_inHg_low',           'mdi:gauge',         'inHg'),
-	'lm_pressure_max_kpa':   AcuparseConditionsSensorConfig('last_month', 'Pressure High',      'pressure_kPa_high',           'mdi:gauge',         'kPa'),
-	'lm_pressure_min_kpa':   AcuparseConditionsSensorConfig('last_month', 'Pressure Low',       'pressure_kPa_low',            'mdi:gauge',         'kPa'),
-	'lm_pressure_max_when':  AcuparseConditionsSensorConfig('last_month', 'Pressure High',      'pressure_inHg_high_recorded', 'mdi:gauge',         'time'),
-	'lm_pressure_min_when':  AcuparseConditionsSensorConfig('last_month', 'Pressure Low',       'pressure_inHg_low_recorded',  'mdi:gauge',         'time'),
-	'lm_relh_max':           AcuparseConditionsSensorConfig('last_month', 'Humidity High',      'relH_high',                   'mdi:water',         '%'),
-	'lm_relh_min':           AcuparseConditionsSensorConfig('last_month', 'Humidity Low',       'relH_low',                    'mdi:water',         '%'),
-	'lm_relh_max_when':      AcuparseConditionsSensorConfig('last_month', 'Humidity High',      'relH_high_recorded',          'mdi:water',         'time'),
-	'lm_relh_min_when':      AcuparseConditionsSensorConfig('last_month', 'Humidity Low',       'relH_low_recorded',           'mdi:water',         'time'),
-	'lm_rain_rate_in_max':   AcuparseConditionsSensorConfig('last_month', 'Rain Rate Max',      'rainfall_IN_most',            'mdi:umbrella',      'in/hr'),
-	'lm_rain_rate_mm_max':   AcuparseConditionsSensorConfig('last_month', 'Rain Rate Max',      'rainfall_MM_most',            'mdi:umbrella',      'mm/hr'),
-	'lm_rain_rate_max_when': AcuparseConditionsSensorConfig('last_month', 'Rain Rate Max',      'rainfall_IN_most_recorded',   'mdi:umbrella',      'time'),
-	'lm_rain_in_total':      AcuparseConditionsSensorConfig('last_month', 'Rain Total',         'rainfall_IN_total',           'mdi:umbrella',      LENGTH_INCHES),
-	'lm_rain_mm_total':      AcuparseConditionsSensorConfig('last_month', 'Rain Total',         'rainfall_MM_total',           'mdi:umbrella',      'mm'),
-
-	'ty_temp_max':           AcuparseConditionsSensorConfig('this_year', 'Temp High',          'tempF_high',                  'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'ty_temp_min':           AcuparseConditionsSensorConfig('this_year', 'Temp Low',           'tempF_low',                   'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'ty_temp_max_when':      AcuparseConditionsSensorConfig('this_year', 'Temp High',          'tempF_high_recorded',         'mdi:thermometer',   'time'),
-	'ty_temp_min_when':      AcuparseConditionsSensorConfig('this_year', 'Temp Low',           'tempF_low_recorded',          'mdi:thermometer',   'time'),
-	'ty_wind_max_mph':       AcuparseConditionsSensorConfig('this_year', 'Wind Max',           'windS_mph_high',              'mdi:weather-windy', 'mph'),
-	'ty_wind_max_kmh':       AcuparseConditionsSensorConfig('this_year', 'Wind Max',           'windS_kmh_high',              'mdi:weather-windy', 'kph'),
-	'ty_wind_max_dir':       AcuparseConditionsSensorConfig('this_year', 'Wind Max',           'windDIR',                     'mdi:weather-windy', 'direction'),
-	'ty_wind_max_when':      AcuparseConditionsSensorConfig('this_year', 'Wind Max',           'windS_mph_high_recorded',     'mdi:weather-windy', 'time'),
-	'ty_pressure_max_inhg':  AcuparseConditionsSensorConfig('this_year', 'Pressure High',      'pressure_inHg_high',          'mdi:gauge',         'inHg'),
-	'ty_pressure_min_inhg':  AcuparseConditionsSensorConfig('this_year', 'Pressure Low',       'pressure_inHg_low',           'mdi:gauge',         'inHg'),
-	'ty_pressure_max_kpa':   AcuparseConditionsSensorConfig('this_year', 'Pressure High',      'pressure_kPa_high',           'mdi:gauge',         'kPa'),
-	'ty_pressure_min_kpa':   AcuparseConditionsSensorConfig('this_year', 'Pressure Low',       'pressure_kPa_low',            'mdi:gauge',         'kPa'),
-	'ty_pressure_max_when':  AcuparseConditionsSensorConfig('this_year', 'Pressure High',      'pressure_inHg_high_recorded', 'mdi:gauge',         'time'),
-	'ty_pressure_min_when':  AcuparseConditionsSensorConfig('this_year', 'Pressure Low',       'pressure_inHg_low_recorded',  'mdi:gauge',         'time'),
-	'ty_relh_max':           AcuparseConditionsSensorConfig('this_year', 'Humidity High',      'relH_high',                   'mdi:water',         '%'),
-	'ty_relh_min':           AcuparseConditionsSensorConfig('this_year', 'Humidity Low',       'relH_low',                    'mdi:water',         '%'),
-	'ty_relh_max_when':      AcuparseConditionsSensorConfig('this_year', 'Humidity High',      'relH_high_recorded',          'mdi:water',         'time'),
-	'ty_relh_min_when':      AcuparseConditionsSensorConfig('this_year', 'Humidity Low',       'relH_low_recorded',           'mdi:water',         'time'),
-	'ty_rain_rate_in_max':   AcuparseConditionsSensorConfig('this_year', 'Rain Rate Max',      'rainfall_IN_most',            'mdi:umbrella',      'in/hr'),
-	'ty_rain_rate_mm_max':   AcuparseConditionsSensorConfig('this_year', 'Rain Rate Max',      'rainfall_MM_most',            'mdi:umbrella',      'mm/hr'),
-	'ty_rain_rate_max_when': AcuparseConditionsSensorConfig('this_year', 'Rain Rate Max',      'rainfall_IN_most_recorded',   'mdi:umbrella',      'time'),
-	'ty_rain_in_total':      AcuparseConditionsSensorConfig('this_year', 'Rain Total',         'rainfall_IN_total',           'mdi:umbrella',      LENGTH_INCHES),
-	'ty_rain_mm_total':      AcuparseConditionsSensorConfig('this_year', 'Rain Total',         'rainfall_MM_total',           'mdi:umbrella',      'mm'),
-
-	'at_temp_max':           AcuparseConditionsSensorConfig('all_time', 'Temp High',          'tempF_high',                  'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'at_temp_min':           AcuparseConditionsSensorConfig('all_time', 'Temp Low',           'tempF_low',                   'mdi:thermometer',   TEMP_FAHRENHEIT),
-	'at_temp_max_when':      AcuparseConditionsSensorConfig('all_time', 'Temp High',          'tempF_high_recorded',         'mdi:thermometer',   'time'),
-	'at_temp_min_when':      AcuparseConditionsSensorConfig('all_time', 'Temp Low',           'tempF_low_recorded',          'mdi:thermometer',   'time'),
-	'at_wind_max_mph':       AcuparseConditionsSensorConfig('all_time', 'Wind Max',           'windS_mph_high',              'mdi:weather-windy', 'mph'),
-	'at_wind_max_kmh':       AcuparseConditionsSensorConfig('all_time', 'Wind Max',           'windS_kmh_high',              'mdi:weather-windy', 'kph'),
-	'at_wind_max_dir':       AcuparseConditionsSensorConfig('all_time', 'Wind Max',           'windDIR',                     'mdi:weather-windy', 'direction'),
-	'at_wind_max_when':      AcuparseConditionsSensorConfig('all_time', 'Wind Max',           'windS_mph_high_recorded',     'mdi:weather-windy', 'time'),
-	'at_pressure_max_inhg':  AcuparseConditionsSensorConfig('all_time', 'Pressure High',      'pressure_inHg_high',          'mdi:gauge',         'inHg'),
-	'at_pressure_min_inhg':  AcuparseConditionsSensorConfig('all_time', 'Pressure Low',       'pressure_inHg_low',           'mdi:gauge',         'inHg'),
-	'at_pressure_max_kpa':   AcuparseConditionsSensorConfig('all_time', 'Pressure High',      'pressure_kPa_high',           'mdi:gauge',         'kPa'),
-	'at_pressure_min_kpa':   AcuparseConditionsSensorConfig('all_time', 'Pressure Low',       'pressure_kPa_low',            'mdi:gauge',         'kPa'),
-	'at_pressure_max_when':  AcuparseConditionsSensorConfig('all_time', 'Pressure High',      'pressure_inHg_high_recorded', 'mdi:gauge',         'time'),
-	'at_pressure_min_when':  AcuparseConditionsSensorConfig('all_time', 'Pressure Low',       'pressure_inHg_low_recorded',  'mdi:gauge',         'time'),
-	'at_relh_max':           AcuparseConditionsSensorConfig('all_time', 'Humidity High',      'relH_high',                   'mdi:water',         '%'),
-	'at_relh_min':           AcuparseConditionsSensorConfig('all_time', 'Humidity Low',       'relH_low',                    'mdi:water',         '%'),
-	'at_relh_max_when':      AcuparseConditionsSensorConfig('all_time', 'Humidity High',      'relH_high_recorded',          'mdi:water',         'time'),
-	'at_relh_min_when':      AcuparseConditionsSensorConfig('all_time', 'Humidity Low',       'relH_low_recorded',           'mdi:water',         'time'),
-	'at_rain_rate_in_max':   AcuparseConditionsSensorConfig('all_time', 'Rain Rate Max',      'rainfall_IN_most',            'mdi:umbrella',      'in/hr'),
-	'at_rain_rate_mm_max':   AcuparseConditionsSensorConfig('all_time', 'Rain Rate Max',      'rainfall_MM_most',            'mdi:umbrella',      'mm/hr'),
-	'at_rain_rate_max_when': AcuparseConditionsSensorConfig('all_time', 'Rain Rate Max',      'rainfall_IN_most_recorded',   'mdi:umbrella',      'time'),
-	'at_rain_in_total':      AcuparseConditionsSensorConfig('all_time', 'Rain Total',         'rainfall_IN_total',           'mdi:umbrella',      LENGTH_INCHES),
-	'at_rain_mm_total':      AcuparseConditionsSensorConfig('all_time', 'Rain Total',         'rainfall_MM_total',           'mdi:umbrella',      'mm'),
-	'at_rain_total_since':   AcuparseConditionsSensorConfig('all_time', 'Rain Total',         'rainfall_IN_total_since',     'mdi:umbrella',      'date'),
-	
-	'moon_age':              AcuparseConditionsSensorConfig('moon',     'Moon Age',           'age',                         'mdi:weather-night', 'time'),
-	'moon_phase':            AcuparseConditionsSensorConfig('moon',     'Moon Phase',         'stage',                       None,                ''),
-	'moon_next_new':         AcuparseConditionsSensorConfig('moon',     'Next New Moon',      'next_new',                    'mdi:weather-night', 'date'),
-	'moon_next_full':        AcuparseConditionsSensorConfig('moon',     'Next Full Moon',     'next_full',                   'mdi:weather-night', 'date'),
-	'moon_last_new':         AcuparseConditionsSensorConfig('moon',     'Last New Moon',      'last_new',                    'mdi:weather-night', 'date'),
-	'moon_last_full':        AcuparseConditionsSensorConfig('moon',     'Last Full Moon',     'last_full',                   'mdi:weather-night', 'date'),
-	'moon_distance':         AcuparseConditionsSensorConfig('moon',     'Moon Distance',      'distance',                    'mdi:weather-night', 'miles'),
-	'moon_illumination':     AcuparseConditionsSensorConfig('moon',     'Moon Illumination',  'illumination',                'mdi:weather-night', '%'),
+class SensorCatalog(Mapping):
+	"""Sensor configurations by condition, created when first looked up.
 
-}
+	Built on a table of condition => (section, friendly name, field, icon,
+	unit), which is also what the schema validates against.
+	"""
 
-PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
+	__slots__ = ('_table', '_configs')
+
+	def __init__(self, table):
+		"""Initialize the catalog."""
+		self._table = table
+		self._configs = {}
+
+	def __getitem__(self, condition):
+		cfg = self._configs.get(condition)
+		if cfg is None:
+			cfg = self._configs[condition] = AcuparseConditionsSensorConfig(*self._table[condition])
+		return cfg
+
+	def __contains__(self, condition):
+		return condition in self._table
+
+	def __iter__(self):
+		return iter(self._table)
+
+	def __len__(self):
+		return len(self._table)
+
+
+# Declaration of supported Acuparse sensors, the configurations are only
+# created for the conditions that are used (see SensorCatalog)
+
+# condition => section, friendly name, field, icon, unit
+_SENSORS = (
+	('temp',                   'current', 'Temp',              'tempF',                   'mdi:thermometer',   TEMP_FAHRENHEIT),
+	('temp_trend',             'current', 'Temp',              'tempF_trend',             'mdi:thermometer',   'trend'),
+	('feels',                  'current', 'Temp Feels Like',   'feelsF',                  'mdi:thermometer',   TEMP_FAHRENHEIT),
+	('dewpt',                  'current', 'Dewpoint',          'dewptF',                  'mdi:water',         TEMP_FAHRENHEIT),
+	('temp_high',              'current', 'Temp High ',        'tempF_high',              'mdi:thermometer',   TEMP_FAHRENHEIT),
+	('temp_high_time',         'current', 'Temp High Time',    'high_temp_recorded',      'mdi:thermometer',   'time'),
+	('temp_low',               'current', 'Temp Low',          'tempF_low',               'mdi:thermometer',   TEMP_FAHRENHEIT),
+	('temp_low_time',          'current', 'Temp Low Time',     'low_temp_recorded',       'mdi:thermometer',   'time'),
+	('temp_avg',               'current', 'Temp Average',      'tempF_avg',               'mdi:thermometer',   TEMP_FAHRENHEIT),
+	('relh',                   'current', 'Relative Humidity', 'relH',                    'mdi:water',         '%'),
+	('relh_trend',             'current', 'Relative Humidity', 'relH_trend',              'mdi:water',         'trend'),
+	('pressure_inhg',          'current', 'Pressure',          'pressure_inHg',           'mdi:gauge',         'inHg'),
+	('pressure_kpa',           'current', 'Pressure',          'pressure_kPa',            'mdi:gauge',         'kPa'),
+	('pressure_trend',         'current', 'Pressure',          'inHg_trend',              'mdi:gauge',         'trend'),
+	('wind_mph',               'current', 'Wind',              'windSmph',                'mdi:weather-windy', 'mph'),
+	('wind_kmh',               'current', 'Wind',              'windSkmh',                'mdi:weather-windy', 'kph'),
+	('wind_dir',               'current', 'Wind',              'windDIR',                 'mdi:weather-windy', 'direction'),
+	('wind_deg',               'current', 'Wind',              'windDEG',                 'mdi:weather-windy', 'degrees'),
+	('wind_deg_avg2',          'current', 'Wind Avg 2',        'windDEG_avg2',            'mdi:weather-windy', 'degrees'),
+	('wind_dir_avg2',          'current', 'Wind Avg 2',        'windDIR_avg2',            'mdi:weather-windy', 'direction'),
+	('wind_mph_avg2',          'current', 'Wind Avg 2',        'windSmph_avg2',           'mdi:weather-windy', 'mph'),
+	('wind_kmh_avg2',          'current', 'Wind Avg 2',        'windSkmh_avg2',           'mdi:weather-windy', 'kph'),
+	('wind_deg_avg10',         'current', 'Wind Avg 10',       'windDEG_avg10',           'mdi:weather-windy', 'degrees'),
+	('wind_mph_avg10',         'current', 'Wind Avg 10',       'windSmph_avg10',          'mdi:weather-windy', 'mph'),
+	('wind_kmh_avg10',         'current', 'Wind Avg 10',       'windSkmh_avg10',          'mdi:weather-windy', 'kph'),
+	('wind_deg_peak',          'current', 'Wind Max',          'windDEG_peak',            'mdi:weather-windy', 'degrees'),
+	('wind_dir_peak',          'current', 'Wind Max',          'windDIR_peak',            'mdi:weather-windy', 'direction'),
+	('wind_peak_time',         'current', 'Wind Max',          'wind_recorded_peak',      'mdi:weather-windy', 'time'),
+	('wind_mph_peak',          'current', 'Wind Max',          'windSmph_peak',           'mdi:weather-windy', 'mph'),
+	('wind_kmh_peak',          'current', 'Wind Max',          'windSkmh_peak',           'mdi:weather-windy', 'kph'),
+	('wind_mph_max5',          'current', 'Wind Max 5',        'windSmph_max5',           'mdi:weather-windy', 'mph'),
+	('wind_kmh_max5',          'current', 'Wind Max 5',        'windSkmh_max5',           'mdi:weather-windy', 'kph'),
+	('rain_rate_in',           'current', 'Rain Rate',         'rainIN',                  'mdi:umbrella',      'in/hr'),
+	('rain_rate_mm',           'current', 'Rain Rate',         'rainMM',                  'mdi:umbrella',      'mm/hr'),
+	('rain_total_in_today',    'current', 'Rain Total',        'rainTotalIN_today',       'mdi:umbrella',      LENGTH_INCHES),
+	('rain_total_mm_today',    'current', 'Rain Total',        'rainTotalMM_today',       'mdi:umbrella',      'mm'),
+	('wind_mph_gust10',        'history', 'Wind Gust 10',      'windSmph_max10',          'mdi:weather-windy', 'mph'),
+	('wind_kmh_gust10',        'history', 'Wind Gust 10',      'windSkmh_max10',          'mdi:weather-windy', 'kph'),
+	('rain_rate_in_hour',      'history', 'Rain Rate Hour',    'rainIN_mean60',           'mdi:umbrella',      'in/hr'),
+	('rain_rate_mm_hour',      'history', 'Rain Rate Hour',    'rainMM_mean60',           'mdi:umbrella',      'mm/hr'),
+	('pressure_inhg_tendency', 'history', 'Pressure Tendency', 'pressure_inHg_change180', 'mdi:gauge',         'inHg'),
+	('pressure_kpa_tendency',  'history', 'Pressure Tendency', 'pressure_kPa_change180',  'mdi:gauge',         'kPa'),
+	('temp_rate',              'history', 'Temp Rate',         'tempF_slope60',           'mdi:thermometer',   TEMP_FAHRENHEIT + '/h'),
+	('temp_max_hour',          'history', 'Temp High Hour',    'tempF_max60',             'mdi:thermometer',   TEMP_FAHRENHEIT),
+	('temp_min_hour',          'history', 'Temp Low Hour',     'tempF_min60',             'mdi:thermometer',   TEMP_FAHRENHEIT),
+)
+
+# Historical sections by condition prefix
+ARCHIVE_PREFIXES = (
+	('y', 'yesterday'),
+	('tw', 'this_week'),
+	('tm', 'this_month'),
+	('lm', 'last_month'),
+	('ty', 'this_year'),
+	('at', 'all_time'),
+)
+
+# The conditions of each historical section: condition without the prefix,
+# friendly name, field, icon, unit, and the prefixes that have it (None for all)
+_ARCHIVE_SENSORS = (
+	('temp_max',           'Temp High',     'tempF_high',                  'mdi:thermometer',   TEMP_FAHRENHEIT, None),
+	('temp_min',           'Temp Low',      'tempF_low',                   'mdi:thermometer',   TEMP_FAHRENHEIT, None),
+	('temp_max_when',      'Temp High',     'tempF_high_recorded',         'mdi:thermometer',   'time',          None),
+	('temp_min_when',      'Temp Low',      'tempF_low_recorded',          'mdi:thermometer',   'time',          None),
+	('wind_max_mph',       'Wind Max',      'windS_mph_high',              'mdi:weather-windy', 'mph',           None),
+	('wind_max_kmh',       'Wind Max',      'windS_kmh_high',              'mdi:weather-windy', 'kph',           None),
+	('wind_max_dir',       'Wind Max',      'windDIR',                     'mdi:weather-windy', 'direction',     None),
+	('wind_max_when',      'Wind Max',      'windS_mph_high_recorded',     'mdi:weather-windy', 'time',          None),
+	('pressure_max_inhg',  'Pressure High', 'pressure_inHg_high',          'mdi:gauge',         'inHg',          None),
+	('pressure_min_inhg',  'Pressure Low',  'pressure_inHg_low',           'mdi:gauge',         'inHg',          None),
+	('pressure_max_kpa',   'Pressure High', 'pressure_kPa_high',           'mdi:gauge',         'kPa',           None),
+	('pressure_min_kpa',   'Pressure Low',  'pressure_kPa_low',            'mdi:gauge',         'kPa',           None),
+	('pressure_max_when',  'Pressure High', 'pressure_inHg_high_recorded', 'mdi:gauge',         'time',          None),
+	('pressure_min_when',  'Pressure Low',  'pressure_inHg_low_recorded',  'mdi:gauge',         'time',          None),
+	('relh_max',           'Humidity High', 'relH_high',                   'mdi:water',         '%',             None),
+	('relh_min',           'Humidity Low',  'relH_low',                    'mdi:water',         '%',             None),
+	('relh_max_when',      'Humidity High', 'relH_high_recorded',          'mdi:water',         'time',          None),
+	('relh_min_when',      'Humidity Low',  'relH_low_recorded',           'mdi:water',         'time',          None),
+	('rain_rate_in_max',   'Rain Rate Max', 'rainfall_IN_most',            'mdi:umbrella',      'in/hr',         ('tw', 'tm', 'lm', 'ty', 'at')),
+	('rain_rate_mm_max',   'Rain Rate Max', 'rainfall_MM_most',            'mdi:umbrella',      'mm/hr',         ('tw', 'tm', 'lm', 'ty', 'at')),
+	('rain_rate_max_when', 'Rain Rate Max', 'rainfall_IN_most_recorded',   'mdi:umbrella',      'time',          ('tw', 'tm', 'lm', 'ty', 'at')),
+	('rain_in_total',      'Rain Total',    'rainfall_IN_total',           'mdi:umbrella',      LENGTH_INCHES,   None),
+	('rain_mm_total',      'Rain Total',    'rainfall_MM_total',           'mdi:umbrella',      'mm',            None),
+	('rain_total_since',   'Rain Total',    'rainfall_IN_total_since',     'mdi:umbrella',      'date',          ('at',)),
+)
+
+_MOON_SENSORS = (
+	('moon_age',          'moon', 'Moon Age',          'age',          'mdi:weather-night', 'time'),
+	('moon_phase',        'moon', 'Moon Phase',        'stage',        None,                ''),
+	('moon_next_new',     'moon', 'Next New Moon',     'next_new',     'mdi:weather-night', 'date'),
+	('moon_next_full',    'moon', 'Next Full Moon',    'next_full',    'mdi:weather-night', 'date'),
+	('moon_last_new',     'moon', 'Last New Moon',     'last_new',     'mdi:weather-night', 'date'),
+	('moon_last_full',    'moon', 'Last Full Moon',    'last_full',    'mdi:weather-night', 'date'),
+	('moon_distance',     'moon', 'Moon Distance',     'distance',     'mdi:weather-night', 'miles'),
+	('moon_illumination', 'moon', 'Moon Illumination', 'illumination', 'mdi:weather-night', '%'),
+)
+
+
+def _sensor_table():
+	"""Return condition => (section, friendly name, field, icon, unit)."""
+	table = {}
+	for condition, *cfg in _SENSORS:
+		table[condition] = tuple(cfg)
+	for prefix, section in ARCHIVE_PREFIXES:
+		for condition, friendly_name, field, icon, unit, prefixes in _ARCHIVE_SENSORS:
+			if prefixes is None or prefix in prefixes:
+				table['{}_{}'.format(prefix, condition)] = (section, friendly_name, field, icon, unit)
+	for condition, *cfg in _MOON_SENSORS:
+		table[condition] = tuple(cfg)
+	return table
+
+
+SENSOR_TABLE = _sensor_table()
+SENSOR_TYPES = SensorCatalog(SENSOR_TABLE)
+
+MONITORED_CONDITIONS_SCHEMA = vol.All(cv.ensure_list, vol.Length(min=1), [vol.In(SENSOR_TABLE)])
+
+STATION_SCHEMA = vol.Schema({
 	vol.Required(CONF_HOSTNAME): cv.string,
-	vol.Optional(CONF_DEBUG, default='false'): cv.string,
-	vol.Optional(CONF_REFRESH_SECONDS, default=60): cv.string,
-	vol.Required(CONF_MONITORED_CONDITIONS):
-		vol.All(cv.ensure_list, vol.Length(min=1), [vol.In(SENSOR_TYPES)])
+	vol.Optional(CONF_NAME): cv.string,
+	vol.Optional(CONF_TIMEOUT): cv.positive_int,
+	vol.Optional(CONF_MONITORED_CONDITIONS): MONITORED_CONDITIONS_SCHEMA,
 })
 
+PLATFORM_SCHEMA = vol.All(
+	cv.has_at_least_one_key(CONF_HOSTNAME, CONF_STATIONS),
+	PLATFORM_SCHEMA.extend({
+		vol.Optional(CONF_HOSTNAME): cv.string,
+		vol.Optional(CONF_STATIONS): vol.All(cv.ensure_list, [STATION_SCHEMA]),
+		vol.Optional(CONF_DEBUG, default='false'): cv.string,
+		vol.Optional(CONF_REFRESH_SECONDS, default=60): vol.All(vol.Coerce(int), vol.Range(min=int(MIN_REFRESH.total_seconds()))),
+		vol.Optional(CONF_ADAPTIVE, default=False): cv.boolean,
+		vol.Optional(CONF_PUSH, default=False): cv.boolean,
+		vol.Optional(CONF_DIAGNOSTICS, default=False): cv.boolean,
+		vol.Optional(CONF_TOWERS, default=False): cv.boolean,
+		vol.Optional(CONF_TIMEOUT, default=DEFAULT_TIMEOUT): cv.positive_int,
+		vol.Optional(CONF_MAX_CONCURRENT, default=DEFAULT_MAX_CONCURRENT): cv.positive_int,
+		vol.Optional(CONF_MAX_STALENESS): cv.positive_int,
+		vol.Optional(CONF_UNITS): vol.In([UNITS_IMPERIAL, UNITS_METRIC]),
+		vol.Required(CONF_MONITORED_CONDITIONS): MONITORED_CONDITIONS_SCHEMA,
+	})
+)
+
 
 async def async_setup_platform(hass: HomeAssistantType, config: ConfigType, async_add_entities, discovery_info=None):
 	"""Set up the Acuparse sensor."""
-	latitude = config.get(hass.config.latitude)
-	longitude = config.get(hass.config.longitude)
-	hostname = config.get(CONF_HOSTNAME)
-	refresh_rate = timedelta(seconds=int(config.get(CONF_REFRESH_SECONDS)))
+	refresh_rate = timedelta(seconds=config.get(CONF_REFRESH_SECONDS))
+	adaptive = config.get(CONF_ADAPTIVE)
+	push = config.get(CONF_PUSH)
+	units = config.get(CONF_UNITS)
 	debug = config.get(CONF_DEBUG)
-	
-	_LOGGER.warning("refresh_rate %s", refresh_rate)
-	
-	rest = AcuparseData(hass, hostname, refresh_rate)
+	max_staleness = None
+	if CONF_MAX_STALENESS in config:
+		max_staleness = timedelta(seconds=config[CONF_MAX_STALENESS])
+
+	stations = list(config.get(CONF_STATIONS, []))
+	if CONF_HOSTNAME in config:
+		stations.insert(0, {CONF_HOSTNAME: config[CONF_HOSTNAME]})
+
+	# All stations share HA's pooled client session, and the number of
+	# requests in flight at once is bounded across all platform entries.
+	max_concurrent = config.get(CONF_MAX_CONCURRENT)
+	if DATA_ACUPARSE not in hass.data:
+		hass.data[DATA_ACUPARSE] = (asyncio.Semaphore(max_concurrent), max_concurrent)
+	semaphore, limit = hass.data[DATA_ACUPARSE]
+	if max_concurrent != limit:
+		_LOGGER.warning("max_concurrent is shared by every Acuparse platform, using %d from the first one instead of %d",
+						limit, max_concurrent)
+
 	sensors = []
-	UNIQUE_COUNTER = 0
-	for variable in config[CONF_MONITORED_CONDITIONS]:
-		UNIQUE_COUNTER += 1
+	rests = []
+	for station in stations:
+		hostname = station[CONF_HOSTNAME]
+		name = station.get(CONF_NAME)
+		timeout = station.get(CONF_TIMEOUT, config.get(CONF_TIMEOUT))
+		rest = AcuparseData(hass, hostname, refresh_rate, adaptive, timeout, semaphore,
+							max_staleness=max_staleness, push=push, units=units)
+		rests.append(rest)
 		unique_id_base = "apwx.{}".format(hostname)
-		sensors.append(AcuparseSensor(hass, rest, variable, unique_id_base))
+		for variable in station.get(CONF_MONITORED_CONDITIONS, config[CONF_MONITORED_CONDITIONS]):
+			sensors.append(AcuparseSensor(hass, rest, variable, unique_id_base, name))
+		if config.get(CONF_DIAGNOSTICS):
+			sensors.append(AcuparseDiagnosticsSensor(rest, unique_id_base, name))
+		if config.get(CONF_TOWERS):
+			rest.request_feature(TOWERS)
 
-	await rest.async_update()
-	if not rest.data:
+	# Stations with a saved snapshot come up from it right away and are
+	# refreshed in the background, the others are fetched before adding.
+	await asyncio.gather(*(rest.async_load_snapshot() for rest in rests))
+	await asyncio.gather(*(rest.async_update() for rest in rests if rest.data is None))
+	if not any(rest.data for rest in rests):
 		raise PlatformNotReady
 
-	async_add_entities(sensors, True)
+	async_add_entities(sensors)
+	for rest, station in zip(rests, stations):
+		if config.get(CONF_TOWERS):
+			rest.async_add_tower_listener(
+				_tower_adder(hass, rest, "apwx.{}".format(station[CONF_HOSTNAME]),
+							 station.get(CONF_NAME), async_add_entities))
+		rest.async_start(0 if rest.restored else None)
+
+	@callback
+	def async_stop(event):
+		"""Stop polling and close the streams."""
+		for rest in rests:
+			rest.async_stop()
+
+	hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop)
+
+
+def _tower_adder(hass, rest, unique_id_base, station_name, async_add_entities):
+	"""Return a tower listener adding the sensors of new towers."""
+
+	@callback
+	def add_towers(towers):
+		sensors = []
+		for sensor_id, tower_name in towers:
+			_LOGGER.info("Adding Acuparse tower %s (%s)", tower_name, sensor_id)
+			for kind, (friendly_name, field, icon, unit) in TOWER_SENSOR_TYPES.items():
+				cfg = SensorConfig(TOWER_SECTION.format(sensor_id),
+								   "{} {}".format(tower_name, friendly_name), field,
+								   unit_of_measurement=unit, icon=icon, timestamp='timestamp')
+				sensors.append(AcuparseSensor(hass, rest, "tower_{}_{}".format(slugify(sensor_id), kind),
+											  unique_id_base, station_name, cfg=cfg))
+		async_add_entities(sensors)
+
+	return add_towers
 
 
 class AcuparseSensor(Entity):
 	"""Implementing the Acuparse sensor."""
 
-	def __init__(self, hass: HomeAssistantType, rest, condition, unique_id_base: str):
-		"""Initialize the sensor."""
+	def __init__(self, hass: HomeAssistantType, rest, condition, unique_id_base: str, station_name=None, cfg=None):
+		"""Initialize the sensor, cfg defaults to SENSOR_TYPES[condition]."""
 		self.rest = rest
 		self._condition = condition
 		self._state = None
 		self._attributes = {ATTR_ATTRIBUTION: CONF_ATTRIBUTION,}
-		self._icon = None
 		self._entity_picture = None
-		self._unit_of_measurement = self._cfg_expand("unit_of_measurement")
-		self.rest.request_feature(SENSOR_TYPES[condition].feature)
+		self._remove_listener = None
+		if cfg is None:
+			cfg = SENSOR_TYPES[condition]
+		self._name = cfg.friendly_name
+		if station_name:
+			self._name = "{} {}".format(station_name, cfg.friendly_name)
+		self._unit_of_measurement = cfg.unit_of_measurement
+		self._icon = cfg.icon
+		# calculated by the component without the server, never stale
+		self._always_fresh = cfg.section == 'moon'
+		# slots of the values this sensor reads from AcuparseData.values
+		self._value_slot = rest.register_field(cfg.section, cfg.field)
+		self._attribute_slots = [
+			(attr, rest.register_field(cfg.section, field))
+			for attr, field in cfg.device_state_attributes.items()]
+		self._picture_slot = None
+		if cfg.entity_picture is not None:
+			self._picture_slot = rest.register_field(cfg.section, cfg.entity_picture)
+		self._timestamp_slot = None
+		if cfg.timestamp is not None:
+			self._timestamp_slot = rest.register_field(cfg.section, cfg.timestamp)
 		# This is only the suggested entity id, it might get changed by
 		# the entity registry later.
-		self.entity_id = sensor.ENTITY_ID_FORMAT.format('apwx_' + condition)
+		if station_name:
+			self.entity_id = sensor.ENTITY_ID_FORMAT.format(
+				'apwx_{}_{}'.format(slugify(station_name), condition))
+		else:
+			self.entity_id = sensor.ENTITY_ID_FORMAT.format('apwx_' + condition)
 		self._unique_id = "{}.{}".format(unique_id_base, condition)
 
-	def _cfg_expand(self, what, default=None):
-		"""Parse and return sensor data."""
-		cfg = SENSOR_TYPES[self._condition]
-		val = getattr(cfg, what)
-		if not callable(val):
-			return val
-		try:
-			val = val(self.rest)
-		except (KeyError, IndexError, TypeError, ValueError) as err:
-			_LOGGER.warning("Failed to expand cfg from Acuparse API."
-							" Condition: %s Attr: %s Error: %s",
-							self._condition, what, repr(err))
-			val = default
-
-		return val
+	@property
+	def name(self):
+		"""Return the name of the sensor."""
+		return self._name
 
-	def _update_attrs(self):
-		"""Parse and update device state attributes."""
-		attrs = self._cfg_expand("device_state_attributes", {})
+	@property
+	def available(self):
+		"""Return True if the data is not older than max_staleness.
 
-		for (attr, callback) in attrs.items():
-			if callable(callback):
-				try:
-					self._attributes[attr] = callback(self.rest)
-				except (KeyError, IndexError, TypeError, ValueError) as err:
-					_LOGGER.warning("Failed to update attrs from Acuparse API."
-									" Condition: %s Attr: %s Error: %s",
-									self._condition, attr, repr(err))
-			else:
-				self._attributes[attr] = callback
+		The moon sensors are calculated by the component and stay available
+		while the server is unreachable. The history sensors come from the
+		fetched observations, so they go stale with them.
+		"""
+		if self._always_fresh:
+			return self.rest.values is not None
+		return self.rest.available
 
 	@property
-	def name(self):
-		"""Return the name of the sensor."""
-		return self._cfg_expand("friendly_name")
+	def should_poll(self):
+		"""No polling needed, AcuparseData pushes new data to the sensor."""
+		return False
 
 	@property
 	def state(self):
@@ -412,21 +594,49 @@ class AcuparseSensor(Entity):
 		"""Return the units of measurement."""
 		return self._unit_of_measurement
 
-	async def async_update(self):
-		"""Update current conditions."""
-		await self.rest.async_update()
+	async def async_added_to_hass(self):
+		"""Subscribe to data updates and load the current values."""
+		slots = [self._value_slot] + [slot for attr, slot in self._attribute_slots]
+		if self._picture_slot is not None:
+			slots.append(self._picture_slot)
+		self._remove_listener = self.rest.async_add_listener(
+			slots, self._handle_update)
+		self._refresh()
 
-		if not self.rest.data:
+	async def async_will_remove_from_hass(self):
+		"""Unsubscribe from data updates."""
+		if self._remove_listener is not None:
+			self._remove_listener()
+			self._remove_listener = None
+
+	@callback
+	def _handle_update(self):
+		"""Refresh the sensor after AcuparseData fetched new data."""
+		self._refresh()
+		self.async_schedule_update_ha_state()
+
+	def _refresh(self):
+		"""Update current conditions from the last fetched data."""
+		values = self.rest.values
+		if not values:
 			# no data, return
 			return
 
-		self._state = self._cfg_expand("value")
-		self._update_attrs()
-		self._icon = self._cfg_expand("icon", super().icon)
-		url = self._cfg_expand("entity_picture")
-		if isinstance(url, str):
-			self._entity_picture = re.sub(r'^http://', 'https://',
-										  url, flags=re.IGNORECASE)
+		self._state = values[self._value_slot]
+		for attr, slot in self._attribute_slots:
+			self._attributes[attr] = values[slot]
+		if self._timestamp_slot is not None:
+			self._attributes['date'] = values[self._timestamp_slot]
+		if self.rest.restored:
+			self._attributes[ATTR_SNAPSHOT_AGE] = int(
+				(dt_util.utcnow() - self.rest.fetched).total_seconds())
+		else:
+			self._attributes.pop(ATTR_SNAPSHOT_AGE, None)
+		if self._picture_slot is not None:
+			url = values[self._picture_slot]
+			if isinstance(url, str):
+				self._entity_picture = re.sub(r'^http://', 'https://',
+											  url, flags=re.IGNORECASE)
 
 	@property
 	def unique_id(self) -> str:
@@ -434,34 +644,714 @@ class AcuparseSensor(Entity):
 		return self._unique_id
 
 
+class AcuparseDiagnosticsSensor(Entity):
+	"""Fetch statistics of an Acuparse station.
+
+	The state is the latency of the last fetch, the other statistics are
+	attributes.
+	"""
+
+	def __init__(self, rest, unique_id_base: str, station_name=None):
+		"""Initialize the sensor."""
+		self.rest = rest
+		self._remove_listener = None
+		self._name = "Acuparse Diagnostics"
+		if station_name:
+			self._name = "{} {}".format(station_name, self._name)
+			self.entity_id = sensor.ENTITY_ID_FORMAT.format(
+				'apwx_{}_diagnostics'.format(slugify(station_name)))
+		else:
+			self.entity_id = sensor.ENTITY_ID_FORMAT.format('apwx_diagnostics')
+		self._unique_id = "{}.diagnostics".format(unique_id_base)
+
+	@property
+	def name(self):
+		"""Return the name of the sensor."""
+		return self._name
+
+	@property
+	def should_poll(self):
+		"""No polling needed, AcuparseData pushes new statistics to the sensor."""
+		return False
+
+	@property
+	def state(self):
+		"""Return the latency of the last fetch."""
+		return self.rest.stats['fetch_latency_ms']
+
+	@property
+	def unit_of_measurement(self):
+		"""Return the units of measurement."""
+		return 'ms'
+
+	@property
+	def icon(self):
+		"""Return icon."""
+		return 'mdi:timer'
+
+	@property
+	def device_state_attributes(self):
+		"""Return the fetch statistics."""
+		attributes = {ATTR_ATTRIBUTION: CONF_ATTRIBUTION}
+		attributes.update(self.rest.stats)
+		attributes['skipped_writes'] = self.rest.skipped_writes
+		return attributes
+
+	@property
+	def unique_id(self) -> str:
+		"""Return a unique ID."""
+		return self._unique_id
+
+	async def async_added_to_hass(self):
+		"""Subscribe to statistics updates."""
+		self._remove_listener = self.rest.async_add_stats_listener(
+			self.async_schedule_update_ha_state)
+
+	async def async_will_remove_from_hass(self):
+		"""Unsubscribe from statistics updates."""
+		if self._remove_listener is not None:
+			self._remove_listener()
+			self._remove_listener = None
+
+
 class AcuparseData:
 	"""Get data from Acuparse."""
 
-	REFRESH_RATE = timedelta(seconds=60)
-
-	def __init__(self, hass, hostname, refresh_rate):
+	def __init__(self, hass, hostname, refresh_rate, adaptive=False,
+				 timeout=DEFAULT_TIMEOUT, semaphore=None, max_staleness=None, push=False, units=None):
 		"""Initialize the data object."""
 		self._hass = hass
 		self._hostname = hostname
-		global REFRESH_RATE
-		REFRESH_RATE = refresh_rate
-		_LOGGER.warning("RREFRESH_RATE %s", REFRESH_RATE)
+		# only request the fields of one unit system and derive the others
+		self._units = units
+		if units == UNITS_IMPERIAL:
+			self._conversions = [(imperial, metric, to_metric)
+								 for imperial, metric, to_metric, to_imperial in UNIT_CONVERSIONS]
+		else:
+			self._conversions = [(metric, imperial, to_imperial)
+								 for imperial, metric, to_metric, to_imperial in UNIT_CONVERSIONS]
+		self._push = push
+		self._stream_task = None
+		# current conditions are being pushed over the stream
+		self._streaming = False
+		self._max_staleness = max_staleness
+		self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(slugify(hostname)))
+		# data came from the saved snapshot and has not been refreshed yet
+		self.restored = False
+		self.fetched = None
+		self._available = False
+		self._timeout = timeout
+		self._semaphore = semaphore or asyncio.Semaphore(1)
+		self._refresh_rate = refresh_rate
+		self._adaptive = adaptive
 		self._features = set()
+		# slot => callbacks to run when that value changes
+		self._listeners = {}
+		self._listener_count = 0
+		self._stats_listeners = []
+		# sensor IDs of the towers the tower listeners know about
+		self._towers = set()
+		self._tower_listeners = []
+		self.skipped_writes = 0
+		self.stats = {
+			'fetch_latency_ms': None,
+			'payload_bytes': None,
+			'decode_ms': None,
+			'observation_age_s': None,
+			'server_timing_ms': {},
+			'requests': 0,
+			'skipped_polls': 0,
+			'not_modified': 0,
+			'errors': 0,
+			'timeouts': 0,
+		}
+		self._remove_tracker = None
+		self._remove_moon_tracker = None
+		self._history = ObservationHistory(HISTORY_CAPACITY)
+		self._moon = MoonCalculator(
+			lambda timestamp: dt_util.as_local(dt_util.utc_from_timestamp(timestamp)))
+		self._failures = 0
+		self._observation_interval = None
+		# intervals seen while learning the cadence
+		self._observation_samples = []
+		self._observation_timestamp = None
+		# UTC time of the latest observation, from its own timestamp
+		self._observation_time = None
+		# (section, field) of every registered value, in slot order
+		self._fields = []
+		self._slots = {}
+		self.values = None
+		# section => monotonic time and local date it was last fetched
+		self._section_fetched = {}
+		self._section_day = {}
+		# sections with a new high or low in the current conditions
+		self._records = set()
+		# frozenset of requested sections => ETag, version, full resync time
+		# and the sections as of that version, the base of its deltas
+		self._validators = {}
+		# raw merged payload
+		self._raw = None
 		self.data = None
 		self._session = async_get_clientsession(self._hass)
 
 	def request_feature(self, feature):
-		"""Register feature to be fetched from WU API."""
+		"""Register a data section to be fetched from Acuparse."""
 		self._features.add(feature)
+		if feature == 'history':
+			# calculated from the current conditions
+			self._features.add('current')
+
+	@property
+	def available(self):
+		"""Return True if there is data and it is not older than max_staleness."""
+		if self.values is None:
+			return False
+		if self._max_staleness is None:
+			return True
+		return dt_util.utcnow() - self.fetched <= self._max_staleness
+
+	async def async_load_snapshot(self):
+		"""Restore the last good data saved for this station."""
+		stored = await self._store.async_load()
+		if not stored:
+			return
+		fetched = dt_util.parse_datetime(stored.get('fetched') or '')
+		if fetched is None:
+			return
+		self.data = stored['data']
+		self.fetched = fetched
+		self.values = self._project(self.data)
+		self.restored = True
+		_LOGGER.debug("Restored Acuparse data for %s from %s", self._hostname, fetched)
+
+	@callback
+	def _snapshot(self):
+		"""Return the registered values in a compact form for saving.
+
+		The tower names are saved too, so the tower sensors are added again
+		from the snapshot after a restart.
+		"""
+		data = {}
+		for (section, field), value in zip(self._fields, self.values):
+			data.setdefault(section, {})[field] = value
+		towers = self.data.get(TOWERS)
+		if towers:
+			data[TOWERS] = {sensor_id: {'name': (tower or {}).get('name')}
+							for sensor_id, tower in towers.items()}
+		return {'fetched': self.fetched.isoformat(), 'data': data}
+
+	def register_field(self, section, field):
+		"""Register a value to be projected from the fetched data.
+
+		Returns the slot of the value in self.values.
+		"""
+		key = (section, field)
+		slot = self._slots.get(key)
+		if slot is None:
+			slot = self._slots[key] = len(self._fields)
+			self._fields.append(key)
+			self.request_feature(TOWERS if section.startswith(TOWER_SECTION.format('')) else section)
+			if section == 'history' and field in HISTORY_STATS:
+				current_field, window, statistic = HISTORY_STATS[field]
+				self._history.track(field, current_field, window.total_seconds(), statistic)
+		return slot
+
+	def _project(self, data):
+		"""Flatten the registered values of the fetched data into a list."""
+		values = []
+		append = values.append
+		for section, field in self._fields:
+			section_data = data.get(section)
+			if section_data is None or field not in section_data:
+				_LOGGER.debug("Missing from Acuparse data: %s.%s", section, field)
+				append(None)
+			else:
+				append(section_data[field])
+		return values
+
+	@callback
+	def async_add_listener(self, slots, update_callback):
+		"""Register a callback to run when any of the values in slots change.
+
+		Returns a function that removes the listener again.
+		"""
+		for slot in slots:
+			self._listeners.setdefault(slot, []).append(update_callback)
+		self._listener_count += 1
+
+		@callback
+		def remove_listener():
+			for slot in slots:
+				self._listeners[slot].remove(update_callback)
+			self._listener_count -= 1
+
+		return remove_listener
+
+	@callback
+	def async_add_tower_listener(self, tower_callback):
+		"""Register a callback to run with the (sensor ID, name) of new towers.
+
+		It is called right away with the towers already known. Returns a
+		function that removes the listener again.
+		"""
+		self._tower_listeners.append(tower_callback)
+		self._discover_towers([tower_callback])
+
+		@callback
+		def remove_listener():
+			self._tower_listeners.remove(tower_callback)
+
+		return remove_listener
+
+	@callback
+	def _discover_towers(self, listeners=None):
+		"""Announce the towers that are new in the data to the tower listeners.
+
+		A new listener passed in listeners gets all the towers.
+		"""
+		towers = (self.data or {}).get(TOWERS)
+		known = set() if listeners is not None else self._towers
+		listeners = self._tower_listeners if listeners is None else listeners
+		if not towers or not listeners:
+			return
+		new = [(sensor_id, (tower or {}).get('name') or sensor_id)
+			   for sensor_id, tower in towers.items() if sensor_id not in known]
+		if not new:
+			return
+		self._towers.update(sensor_id for sensor_id, name in new)
+		registered = len(self._fields)
+		for tower_callback in list(listeners):
+			tower_callback(new)
+		if len(self._fields) != registered:
+			# the new sensors registered their values
+			self.values = self._project(self.data)
+
+	@callback
+	def async_add_stats_listener(self, update_callback):
+		"""Register a callback to run after every fetch.
+
+		Returns a function that removes the listener again.
+		"""
+		self._stats_listeners.append(update_callback)
+
+		@callback
+		def remove_listener():
+			self._stats_listeners.remove(update_callback)
+
+		return remove_listener
+
+	def _update_observation_age(self):
+		"""Record the age of the latest observation, its timestamp read in the HA time zone."""
+		try:
+			observed = dt_util.parse_datetime(self.data['current']['timestamp'])
+		except (KeyError, TypeError):
+			return
+		if observed is not None:
+			self.stats['observation_age_s'] = round(
+				(dt_util.utcnow() - dt_util.as_utc(observed)).total_seconds())
+
+	@staticmethod
+	def _parse_server_timing(header):
+		"""Return the durations in a Server-Timing header as a dict."""
+		timings = {}
+		for metric in header.split(','):
+			name, *params = metric.strip().split(';')
+			for param in params:
+				key, _, value = param.strip().partition('=')
+				if key == 'dur':
+					try:
+						timings[name] = float(value)
+					except ValueError:
+						pass
+		return timings
+
+	@callback
+	def async_start(self, delay=None):
+		"""Start the polling loop that pushes new data to the listeners."""
+		if self._remove_tracker is None:
+			self._available = self.available
+			self._schedule_poll(delay)
+		if self._push and 'current' in self._features and self._stream_task is None:
+			# not a tracked task, it only ends when cancelled
+			self._stream_task = self._hass.loop.create_task(self._async_stream())
+		if 'moon' in self._features and self._remove_moon_tracker is None:
+			self._remove_moon_tracker = async_track_time_interval(
+				self._hass, self._async_moon_tick, MOON_REFRESH)
+
+	@callback
+	def _schedule_poll(self, delay=None):
+		"""Schedule the next fetch."""
+		if delay is None:
+			delay = self._next_delay()
+		_LOGGER.debug("Next Acuparse fetch from %s in %.1fs", self._hostname, delay)
+		self._remove_tracker = async_call_later(self._hass, delay, self._async_poll)
+
+	def _next_delay(self):
+		"""Return the number of seconds until the next fetch.
+
+		Failed or slow fetches back off exponentially. In adaptive mode the
+		fetch is scheduled just after the next observation is expected,
+		never later than the configured refresh rate.
+		"""
+		refresh = self._refresh_rate.total_seconds()
+		jitter = random.uniform(0, POLL_JITTER.total_seconds())
+
+		if self._failures:
+			backoff = refresh * 2 ** min(self._failures, 10)
+			return min(backoff, MAX_BACKOFF.total_seconds()) + jitter
+
+		if not self._adaptive or self._streaming:
+			return refresh
+		if self._observation_interval is None:
+			# learning the cadence, see every observation
+			return MIN_REFRESH.total_seconds()
+
+		interval = self._observation_interval
+		since = (dt_util.utcnow() - self._observation_time).total_seconds()
+		expected = interval - since + OBSERVATION_MARGIN.total_seconds()
+		if expected <= 0:
+			if -expected < interval:
+				# overdue, check again shortly
+				expected = MIN_REFRESH.total_seconds()
+			else:
+				# missed observations or clocks apart, keep to the station's phase
+				expected = interval - since % interval + OBSERVATION_MARGIN.total_seconds()
+		return min(max(expected, MIN_REFRESH.total_seconds()) + jitter, refresh)
+
+	def _learn_observation_interval(self):
+		"""Track the interval between new current condition timestamps.
 
-	def _build_url(self, baseurl=_RESOURCE):
-		url = baseurl.format(self._hostname)
+		Until it is known every observation is fetched, and the shortest of
+		the first intervals is taken. After that an interval spanning
+		several observations is divided between them.
+		"""
+		try:
+			timestamp = self.data['current']['timestamp']
+		except (KeyError, TypeError):
+			return
+		if timestamp == self._observation_timestamp:
+			return
+
+		self._observation_timestamp = timestamp
+		observed = dt_util.parse_datetime(timestamp)
+		if observed is None:
+			return
+		# naive Acuparse times are in the HA time zone
+		observed = dt_util.as_utc(observed)
+		previous, self._observation_time = self._observation_time, observed
+		if previous is None:
+			return
+
+		interval = (observed - previous).total_seconds()
+		if interval <= 0 or interval > OBSERVATION_GAP.total_seconds():
+			# clock change or a long outage, not the reporting cadence
+			return
+		if self._observation_interval is None:
+			# the first interval may follow a restart, wait for a second one
+			self._observation_samples.append(interval)
+			if len(self._observation_samples) >= 2:
+				self._observation_interval = min(self._observation_samples)
+			return
+		interval /= max(1, round(interval / self._observation_interval))
+		self._observation_interval = 0.7 * self._observation_interval + 0.3 * interval
+
+	@callback
+	def async_stop(self):
+		"""Stop the polling loop and the stream."""
+		if self._remove_tracker is not None:
+			self._remove_tracker()
+			self._remove_tracker = None
+		if self._stream_task is not None:
+			self._stream_task.cancel()
+			self._stream_task = None
+		if self._remove_moon_tracker is not None:
+			self._remove_moon_tracker()
+			self._remove_moon_tracker = None
+
+	def _poll_sections(self):
+		"""Return the sections to request, leaving out the local and streamed ones."""
+		sections = self._features - LOCAL_SECTIONS
+		if self._streaming:
+			sections -= {'current'}
+		return sections
+
+	def _due_sections(self):
+		"""Return the sections to request in this poll, see SECTION_REFRESH."""
+		now = time.monotonic()
+		today = dt_util.now().date()
+		due = set()
+		for section in self._poll_sections():
+			fetched = self._section_fetched.get(section)
+			if fetched is None or self._section_day.get(section) != today:
+				due.add(section)
+				continue
+			interval = SECTION_REFRESH.get(section, (timedelta(0), False))[0]
+			if section in self._records:
+				interval = min(interval, RECORD_REFRESH)
+			if now - fetched >= interval.total_seconds():
+				due.add(section)
+		return due
+
+	def _sections_fetched(self, sections):
+		"""Record that sections were fetched successfully."""
+		now = time.monotonic()
+		today = dt_util.now().date()
+		for section in sections:
+			self._section_fetched[section] = now
+			self._section_day[section] = today
+		self._records -= sections
+
+	def _check_records(self):
+		"""Find the historical sections the current conditions beat a high or low of."""
+		current = self.data.get('current')
+		if not current:
+			return
+		for section, (interval, records) in SECTION_REFRESH.items():
+			if not records or section in self._records or not isinstance(self.data.get(section), dict):
+				continue
+			archive = self.data[section]
+			for field, (high, low) in RECORD_FIELDS.items():
+				try:
+					value = float(current[field])
+				except (KeyError, TypeError, ValueError):
+					continue
+				try:
+					if value > float(archive[high]):
+						self._records.add(section)
+						break
+				except (KeyError, TypeError, ValueError):
+					pass
+				try:
+					if low is not None and value < float(archive[low]):
+						self._records.add(section)
+						break
+				except (KeyError, TypeError, ValueError):
+					pass
+
+	@callback
+	def _async_moon_tick(self, now=None):
+		"""Recalculate the moon section and notify listeners of changed values."""
+		if self.data is None:
+			return
+		old = self.values
+		data = dict(self.data)
+		data['moon'] = self._moon.moon_data()
+		self.data = data
+		self.values = self._project(data)
+		self._notify(old, self.restored)
+
+	async def _async_poll(self, now=None):
+		"""Fetch new data once and notify listeners of changed values."""
+		self._remove_tracker = None
+		old = self.values
+		restored = self.restored
+		try:
+			if self._due_sections():
+				start = time.monotonic()
+				try:
+					success = await self.async_update()
+				except asyncio.CancelledError:
+					raise
+				except Exception:
+					# a bad payload must not stop the polling loop
+					self.stats['errors'] += 1
+					_LOGGER.exception("Unexpected error updating Acuparse data from %s", self._hostname)
+					success = False
+				if success and time.monotonic() - start < SLOW_RESPONSE.total_seconds():
+					self._failures = 0
+				else:
+					self._failures += 1
+				self._learn_observation_interval()
+				self._update_observation_age()
+				for update_callback in list(self._stats_listeners):
+					update_callback()
+			else:
+				# no section due, the old throttle skip
+				self.stats['skipped_polls'] += 1
+		finally:
+			self._schedule_poll()
+		self._notify(old, restored)
+
+	async def _async_stream(self):
+		"""Receive current conditions from the stream, reconnecting when it drops.
+
+		Polling carries on for the other sections, and takes the current
+		conditions back whenever the stream is down.
+		"""
+		url = _STREAM_RESOURCE.format(self._hostname)
+		timeout = aiohttp.ClientTimeout(
+			total=None, connect=self._timeout,
+			sock_read=STREAM_READ_TIMEOUT.total_seconds())
+		retry = 1
+		while True:
+			try:
+				async with self._session.get(url, timeout=timeout,
+											 headers={'Accept': 'text/event-stream'}) as response:
+					response.raise_for_status()
+					event, data = None, []
+					async for line in response.content:
+						line = line.decode('utf-8').rstrip('\r\n')
+						if not line:
+							if event == 'current' and data:
+								self._handle_stream_current(json_loads('\n'.join(data)))
+								retry = 1
+							event, data = None, []
+						elif line.startswith(':'):
+							continue
+						else:
+							field, _, value = line.partition(':')
+							value = value[1:] if value.startswith(' ') else value
+							if field == 'event':
+								event = value
+							elif field == 'data':
+								data.append(value)
+			except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as err:
+				_LOGGER.debug("Acuparse stream from %s closed: %s", self._hostname, repr(err))
+			except asyncio.CancelledError:
+				raise
+			except Exception:
+				# reconnect, polling takes the current conditions back meanwhile
+				_LOGGER.exception("Unexpected error in the Acuparse stream from %s", self._hostname)
+			if self._streaming:
+				_LOGGER.info("Acuparse stream from %s lost, polling current conditions", self._hostname)
+			self._streaming = False
+			await asyncio.sleep(retry)
+			retry = min(retry * 2, STREAM_MAX_RETRY.total_seconds())
+
+	@callback
+	def _handle_stream_current(self, current):
+		"""Apply current conditions received from the stream."""
+		old = self.values
+		restored = self.restored
+		# before the first poll after a restart the other sections are those of the snapshot
+		raw = dict(self._raw if self._raw is not None else self.data or {})
+		raw['current'] = current
+		self._apply(raw)
+		if not self._streaming:
+			_LOGGER.info("Receiving current conditions from %s over its stream", self._hostname)
+			self._streaming = True
+		self._learn_observation_interval()
+		self._notify(old, restored)
+
+	@callback
+	def _notify(self, old, restored):
+		"""Run the listeners of the values that changed from old."""
+		self._discover_towers()
+		new = self.values
+		available = self.available
+		if available != self._available:
+			# became stale or fresh again, all sensors need writing
+			self._available = available
+			old = None
+		elif restored and not self.restored:
+			# first fresh data replaces the snapshot, drop its age
+			old = None
+		if new is None or new is old:
+			return
+
+		if old is None:
+			changed = range(len(new))
+		else:
+			changed = [slot for slot, (old_value, new_value) in enumerate(zip(old, new))
+					   if old_value != new_value]
+			changed.extend(range(len(old), len(new)))
+
+		callbacks = {}
+		for slot in changed:
+			for update_callback in self._listeners.get(slot, ()):
+				callbacks[update_callback] = None
+		self.skipped_writes += self._listener_count - len(callbacks)
+		_LOGGER.debug("%s: %d sensors changed, %d skipped writes in total",
+					  self._hostname, len(callbacks), self.skipped_writes)
+		for update_callback in list(callbacks):
+			update_callback()
+
+	def _build_url(self, sections, baseurl=_RESOURCE):
+		url = baseurl.format(self._hostname, ','.join(sorted(sections)))
+		if self._units is not None:
+			url += '&units={}'.format(self._units)
+		validator = self._validators.get(frozenset(sections))
+		if (validator is not None and validator['version'] is not None
+				and time.monotonic() < validator['resync_at']):
+			url += '&since={}'.format(validator['version'])
 		return url
+
+	@staticmethod
+	def _merge(raw, delta):
+		"""Return raw with the changed and removed fields of a delta applied."""
+		data = dict(raw)
+		for section, fields in delta.get('changed', {}).items():
+			merged = dict(data.get(section) or {})
+			merged.update(fields)
+			data[section] = merged
+		for section, fields in delta.get('removed', {}).items():
+			if section in data:
+				merged = dict(data[section])
+				for field in fields:
+					merged.pop(field, None)
+				data[section] = merged
+		return data
+
+	def _apply(self, raw):
+		"""Make a new raw payload the current data."""
+		self._raw = raw
+		self.data = self._process(raw)
+		self.values = self._project(self.data)
+		self._check_records()
+		self.fetched = dt_util.utcnow()
+		self.restored = False
+		self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+
+	def _process(self, raw):
+		"""Return a copy of the raw payload with the current conditions cleaned up.
+
+		The local sections and the fields of the unit system the payload
+		left out are added here.
+		"""
+		result = dict(raw)
+		if self._units is not None:
+			for section, fields in raw.items():
+				if isinstance(fields, dict):
+					result[section] = self._derive_units(fields)
+		if 'moon' in self._features:
+			result['moon'] = self._moon.moon_data()
+		if 'current' in result:
+			current = result['current'] = dict(result['current'])
+			if current.get('feelsF') in (0, None):
+				_LOGGER.info("Feels like = 0 : setting to current temp")
+				current['feelsF'] = current.get('tempF')
+				current['feelsC'] = current.get('tempC')
+
+			for field in ('high_temp_recorded', 'low_temp_recorded'):
+				if field in current:
+					current[field] = self.format_time(current[field])
+			if 'history' in self._features:
+				result['history'] = self._history.add(result['current'])
+		towers = result.get(TOWERS)
+		if towers:
+			for sensor_id, tower in towers.items():
+				result[TOWER_SECTION.format(sensor_id)] = tower
+		return result
 	
+	def _derive_units(self, fields):
+		"""Return a copy of fields with the missing unit system converted."""
+		derived = dict(fields)
+		for source, target, conversion in self._conversions:
+			if target not in fields and source in fields:
+				try:
+					derived[target] = conversion(float(fields[source]))
+				except (TypeError, ValueError):
+					derived[target] = None
+		return derived
+
 	def format_time(self, string):
-		parts = string.split(":")
-		hours = int(parts[0])
-		minutes = parts[1]
+		"""Format a 24 hour H:i time with AM/PM, anything else is returned as is."""
+		try:
+			parts = string.split(":")
+			hours = int(parts[0])
+			minutes = parts[1]
+		except (AttributeError, IndexError, ValueError):
+			return string
 		
 		if (hours == 0):
 			hours = 12
@@ -476,26 +1366,86 @@ class AcuparseData:
 		
 		return "{}:{}{}".format(hours, minutes, ampm)
 
-	@Throttle(MIN_TIME_BETWEEN_UPDATES)
 	async def async_update(self):
-		"""Get the latest data from Acuparse."""
+		"""Get the latest data from Acuparse.
+
+		Only the sections that are due are requested, and merged into the
+		data of the others. Returns True when the fetch succeeded, even if
+		nothing changed.
+		"""
+		if not self._poll_sections():
+			# only local sections, nothing to fetch
+			self._apply(dict(self._raw or {}))
+			return True
+		sections = self._due_sections()
+		if not sections:
+			return True
 		try:
-			with async_timeout.timeout(10, loop=self._hass.loop):
-				response = await self._session.get(self._build_url())
-			result = await response.json(content_type='text/html')
-			
-			if result['current']['feelsF'] == 0:
-				_LOGGER.info("Feels like = 0 : setting to current temp")
-				result['current']['feelsF'] = result['current']['tempF']
-				result['current']['feelsC'] = result['current']['tempC']
-				
-			result['current']['high_temp_recorded'] = self.format_time(result['current']['high_temp_recorded'])
-			result['current']['low_temp_recorded'] = self.format_time(result['current']['low_temp_recorded'])
-				
-			self.data = result
+			headers = {}
+			key = frozenset(sections)
+			validator = self._validators.get(key)
+			if self.data is not None and validator is not None and validator['etag'] is not None:
+				headers['If-None-Match'] = validator['etag']
+			stats = self.stats
+			stats['requests'] += 1
+			# the wait for a free slot counts towards the timeout, so stations
+			# stuck on unreachable hosts cannot hold this one up for longer
+			with async_timeout.timeout(self._timeout, loop=self._hass.loop):
+				async with self._semaphore:
+					start = time.monotonic()
+					response = await self._session.get(self._build_url(sections), headers=headers)
+					if response.status == 304:
+						# no new observation since the last fetch
+						response.release()
+						stats['fetch_latency_ms'] = round((time.monotonic() - start) * 1000, 1)
+						stats['not_modified'] += 1
+						if validator is not None:
+							self._validators[key] = self._validators.pop(key)
+						self.fetched = dt_util.utcnow()
+						self._sections_fetched(sections)
+						return True
+					body = await response.read()
+					stats['fetch_latency_ms'] = round((time.monotonic() - start) * 1000, 1)
+
+			stats['payload_bytes'] = len(body)
+			stats['server_timing_ms'] = self._parse_server_timing(
+				response.headers.get('Server-Timing', ''))
+			start = time.monotonic()
+			result = json_loads(body)
+			stats['decode_ms'] = round((time.monotonic() - start) * 1000, 2)
+
+			if (validator is not None and validator['version'] is not None
+					and response.headers.get('X-Acuparse-Delta') == validator['version']):
+				# applied to the sections as of that version, other requests
+				# may have updated them since
+				base = self._merge(validator['base'], result)
+				resync_at = validator['resync_at']
+			else:
+				base = result
+				resync_at = time.monotonic() + FULL_RESYNC.total_seconds()
+			# sections that were not requested (not due or streamed) are kept
+			raw = dict(self._raw or {})
+			raw.update(base)
+			self._validators.pop(key, None)
+			self._validators[key] = {
+				'etag': response.headers.get('ETag'),
+				'version': response.headers.get('X-Acuparse-Version'),
+				'resync_at': resync_at,
+				'base': base,
+			}
+			if len(self._validators) > VALIDATOR_SETS:
+				# the least recently fetched
+				del self._validators[next(iter(self._validators))]
+			self._sections_fetched(sections)
+			self._apply(raw)
+			return True
 		except ValueError as err:
-			_LOGGER.error("Check Acuparse API %s", err.args)
+			self.stats['errors'] += 1
+			_LOGGER.error("Check Acuparse API on %s %s", self._hostname, err.args)
 		except (asyncio.TimeoutError) as err:
-			_LOGGER.error("Timeout Error fetching Acuparse data: %s", repr(err))
+			self.stats['timeouts'] += 1
+			_LOGGER.error("Timeout Error fetching Acuparse data from %s: %s", self._hostname, repr(err))
 		except (aiohttp.ClientError) as err:
-			_LOGGER.error("Client Error fetching Acuparse data: %s", repr(err))
+			self.stats['errors'] += 1
+			_LOGGER.error("Client Error fetching Acuparse data from %s: %s", self._hostname, repr(err))
+		return False
@@ -0,0 +1,86 @@
+"""Tests for the rolling statistics of the history sensors."""
+import random
+
+import pytest
+
+from custom_components.acuparse.history import ObservationHistory, RollingWindow
+
+
+def expected(samples, window, statistic, capacity):
+	"""Calculate a statistic of the samples still in the window the slow way."""
+	newest = samples[-1][0]
+	kept = [(time, value) for time, value in samples[-capacity:] if time > newest - window]
+	values = [value for time, value in kept]
+	if statistic == 'max':
+		return max(values)
+	if statistic == 'min':
+		return min(values)
+	if statistic == 'mean':
+		return round(sum(values) / len(values), 2)
+	if len(kept) < 2:
+		return None
+	if statistic == 'change':
+		if kept[-1][0] - kept[0][0] < 0.9 * window:
+			return None
+		return round(kept[-1][1] - kept[0][1], 2)
+	count = len(kept)
+	mean_t = sum(time for time, value in kept) / count
+	mean_v = sum(values) / count
+	spread = sum((time - mean_t) ** 2 for time, value in kept)
+	if spread <= 0:
+		return None
+	return round(sum((time - mean_t) * (value - mean_v) for time, value in kept) / spread * 3600, 2)
+
+
+@pytest.mark.parametrize('statistic', ['min', 'max', 'mean', 'slope', 'change'])
+@pytest.mark.parametrize('capacity', [8, 720])
+def test_rolling_window_matches_brute_force(statistic, capacity):
+	rng = random.Random(statistic)
+	window = 600
+	rolling = RollingWindow(window, statistic, capacity)
+	samples = []
+	time = 1.7e9
+	for _ in range(2000):
+		time += rng.choice((16, 18, 20, 60, 400))
+		value = round(rng.uniform(-10, 40), 1)
+		samples.append((time, value))
+		rolling.add(time, value)
+		assert rolling.value() == pytest.approx(expected(samples, window, statistic, capacity), abs=0.011)
+
+
+def test_rolling_window_rejects_unknown_statistic():
+	with pytest.raises(ValueError):
+		RollingWindow(600, 'median', 10)
+
+
+def test_rolling_window_clear():
+	rolling = RollingWindow(600, 'max', 10)
+	rolling.add(0, 5)
+	rolling.clear()
+	assert rolling.value() is None
+	rolling.add(10, 1)
+	assert rolling.value() == 1
+
+
+def test_history_ignores_repeated_observations():
+	history = ObservationHistory(10)
+	history.track('gust', 'windSmph', 600, 'max')
+	assert history.add({'timestamp': '2024-01-01 12:00:00', 'windSmph': 5}) == {
+		'timestamp': '2024-01-01 12:00:00', 'gust': 5}
+	history.add({'timestamp': '2024-01-01 12:00:00', 'windSmph': 9})
+	assert history.add({'timestamp': '2024-01-01 12:00:18', 'windSmph': 3})['gust'] == 5
+
+
+def test_history_starts_over_when_the_clock_goes_back():
+	history = ObservationHistory(10)
+	history.track('gust', 'windSmph', 600, 'max')
+	history.add({'timestamp': '2024-11-03 01:59:42', 'windSmph': 20})
+	values = history.add({'timestamp': '2024-11-03 01:00:00', 'windSmph': 4})
+	assert values['gust'] == 4
+
+
+def test_history_skips_bad_values():
+	history = ObservationHistory(10)
+	history.track('gust', 'windSmph', 600, 'max')
+	assert history.add({'timestamp': '2024-01-01 12:00:00', 'windSmph': None})['gust'] is None
+	assert history.add({'timestamp': 'not a time', 'windSmph': 5})['gust'] is None
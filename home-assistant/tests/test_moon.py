@@ -0,0 +1,52 @@
+"""Tests for the local moon section."""
+from datetime import datetime, timezone
+
+import pytest
+
+from custom_components.acuparse.moon import MoonCalculator, phase, phasehunt
+
+
+def utc(*args):
+	return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+# Published UTC times of the phases from January to March 2024
+PHASES_2024 = [
+	utc(2024, 1, 11, 11, 57), utc(2024, 1, 18, 3, 52), utc(2024, 1, 25, 17, 54), utc(2024, 2, 2, 23, 18),
+	utc(2024, 2, 9, 22, 59), utc(2024, 2, 16, 15, 1), utc(2024, 2, 24, 12, 30), utc(2024, 3, 3, 15, 23),
+]
+
+
+@pytest.mark.parametrize('when', [utc(2024, 1, 11, 12), utc(2024, 1, 20), utc(2024, 2, 9, 22)])
+def test_phasehunt_matches_published_phases(when):
+	for calculated, published in zip(phasehunt(when), PHASES_2024):
+		assert calculated == pytest.approx(published, abs=5 * 60)
+
+
+def test_phase_at_full_and_new_moon():
+	fraction, illumination, age, distance = phase(utc(2024, 1, 25, 17, 54))
+	assert fraction == pytest.approx(0.5, abs=0.001)
+	assert illumination == pytest.approx(1, abs=0.001)
+	assert 356000 < distance < 407000
+	fraction, illumination, age, distance = phase(utc(2024, 1, 11, 11, 57))
+	assert illumination == pytest.approx(0, abs=0.001)
+
+
+def test_moon_data_fields():
+	calculator = MoonCalculator(lambda timestamp: datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None))
+	data = calculator.moon_data(utc(2024, 1, 20, 6, 30, 45))
+	assert data == {
+		'age': data['age'],
+		'stage': 'Waxing Gibbous',
+		'next_new': '9 Feb @ 23:00',
+		'next_full': '24 Feb @ 12:31',
+		'last_new': '11 Jan @ 11:58',
+		# the full moon of the current lunation, as in data.php
+		'last_full': '25 Jan @ 17:54',
+		'distance': data['distance'],
+		'illumination': data['illumination'],
+		'icon_url': '/local/moon/{}.gif'.format(round(data['age'])),
+		'timestamp': '2024-01-20 06:30:00',
+	}
+	assert 9 < data['age'] < 10
+	assert calculator.moon_data(utc(2024, 1, 20, 6, 30, 59)) is data
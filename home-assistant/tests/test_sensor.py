@@ -0,0 +1,26 @@
+"""Tests for the payload handling of AcuparseData."""
+import pytest
+
+pytest.importorskip('homeassistant')
+
+from custom_components.acuparse.sensor import AcuparseData  # noqa: E402
+
+
+def test_merge_applies_changed_and_removed_fields():
+	raw = {'current': {'tempF': 68.2, 'windSmph': 5, 'windDIR': 'SW'}, 'moon': {'age': 12.3}}
+	delta = {
+		'changed': {'current': {'tempF': 68.4}, 'towers': {'00000001': {'name': 'Tower 1'}}},
+		'removed': {'current': ['windDIR'], 'yesterday': ['tempF_high']},
+	}
+	assert AcuparseData._merge(raw, delta) == {
+		'current': {'tempF': 68.4, 'windSmph': 5},
+		'moon': {'age': 12.3},
+		'towers': {'00000001': {'name': 'Tower 1'}},
+	}
+	# the raw payload is left as it was
+	assert raw['current'] == {'tempF': 68.2, 'windSmph': 5, 'windDIR': 'SW'}
+
+
+def test_merge_of_empty_delta_keeps_everything():
+	raw = {'current': {'tempF': 68.2}}
+	assert AcuparseData._merge(raw, {'changed': {}, 'removed': {}}) == raw